@@ -0,0 +1,291 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Statistics over archives of played games. Game records are
+#                   streamed from disk, replayed on the print-free Position,
+#                   and reduced to per-game features held in fixed-size NumPy
+#                   column chunks. ArchiveStats aggregates chunks with
+#                   vectorized operations, and analyze_archive() spreads files
+#                   across worker processes, so memory use stays bounded by
+#                   the chunk size regardless of archive size.
+
+import multiprocessing
+
+import numpy as np
+
+from ChessEngine import DROP_FAIRIES, PIECE_TYPES, Position, parse_move, read_records
+
+
+FAIRY_TYPES = ("none", "falcon", "hunter")
+RESULTS = ("UNFINISHED", "WHITE_WON", "BLACK_WON", "DRAW")
+
+# Longest game length tracked individually; longer games share the last bin
+MAX_PLIES = 1024
+
+# Per-game feature columns and their dtypes. Plies of first fairy entries are
+# -1 when that side never entered one.
+COLUMNS = {
+    "result": np.int8,
+    "plies": np.int32,
+    "first_fairy_ply_white": np.int32,
+    "first_fairy_ply_black": np.int32,
+    "first_fairy_type": np.int8,
+    "captures_white": np.int16,
+    "captures_black": np.int16,
+    "captured": (np.int16, len(PIECE_TYPES))
+}
+
+
+class FeatureChunk:
+    """Preallocated NumPy columns holding the features of up to size games."""
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._count = 0
+        self._columns = {
+            name: np.zeros((size, dtype[1]) if isinstance(dtype, tuple) else size,
+                           dtype=dtype[0] if isinstance(dtype, tuple) else dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return self._count
+
+    def is_full(self) -> bool:
+        """Returns whether every row of the chunk is in use."""
+        return self._count == self._size
+
+    def clear(self) -> None:
+        """Empties the chunk so its arrays can be reused."""
+        self._count = 0
+
+    def get_columns(self) -> "dict[str, np.ndarray]":
+        """Returns views of the columns trimmed to the rows in use."""
+        return {name: column[:self._count] for name, column in self._columns.items()}
+
+    def append(self, result: str, moves: "list[str]") -> bool:
+        """Replays a game and writes its features to the next row. Returns
+        False, leaving the chunk unchanged, if a move is malformed or illegal.
+        """
+        row = self._count
+        columns = self._columns
+        captured = columns["captured"][row]
+        captured[:] = 0
+
+        position = Position()
+        first = {"white": -1, "black": -1}
+        first_type = 0
+        captures = {"white": 0, "black": 0}
+
+        for ply, text in enumerate(moves):
+            move = parse_move(text)
+
+            if move is None or not position.is_legal(move):
+                return False
+
+            color = position.get_color()
+            piece = position.get_capture(move)
+            fairy = DROP_FAIRIES.get(move // 64)
+
+            if fairy is not None and first[color] < 0:
+                first[color] = ply
+                first_type = first_type or FAIRY_TYPES.index(fairy)
+
+            if piece is not None:
+                captures[color] += 1
+                captured[PIECE_TYPES.index(piece.get_type())] += 1
+
+            position.push(move)
+
+        columns["result"][row] = RESULTS.index(result) if result in RESULTS else 0
+        columns["plies"][row] = len(moves)
+        columns["first_fairy_ply_white"][row] = first["white"]
+        columns["first_fairy_ply_black"][row] = first["black"]
+        columns["first_fairy_type"][row] = first_type
+        columns["captures_white"][row] = captures["white"]
+        columns["captures_black"][row] = captures["black"]
+        self._count += 1
+
+        return True
+
+
+def iter_feature_chunks(path: str, chunk_size: int = 4096):
+    """Streams a game record file and yields a FeatureChunk each time one
+    fills, then a final partial chunk. The same chunk object is reused, so
+    consume each one before requesting the next. Games that fail to replay
+    are skipped; the count of skipped games is available as the generator's
+    return value.
+    """
+    chunk = FeatureChunk(chunk_size)
+    skipped = 0
+
+    for result, moves in read_records(path):
+        if not chunk.append(result, moves):
+            skipped += 1
+
+        if chunk.is_full():
+            yield chunk
+            chunk.clear()
+
+    if len(chunk):
+        yield chunk
+
+    return skipped
+
+
+class ArchiveStats:
+    """Running aggregates over per-game feature chunks. Holds only
+    fixed-size counters and histograms, so it can absorb any number of games
+    and be merged across processes.
+    """
+    def __init__(self) -> None:
+        self._games = 0
+        self._skipped = 0
+        self._results = np.zeros(len(RESULTS), dtype=np.int64)
+        self._lengths = np.zeros(MAX_PLIES + 1, dtype=np.int64)
+        self._first_fairy = {
+            color: np.zeros(MAX_PLIES + 1, dtype=np.int64)
+            for color in ("white", "black")
+        }
+        self._first_type = np.zeros(len(FAIRY_TYPES), dtype=np.int64)
+        self._captures = np.zeros(len(PIECE_TYPES), dtype=np.int64)
+        self._capture_games = np.zeros(len(PIECE_TYPES), dtype=np.int64)
+        self._side_captures = np.zeros(2, dtype=np.int64)
+
+    def get_games(self) -> int:
+        """Returns the number of games aggregated."""
+        return self._games
+
+    def get_skipped(self) -> int:
+        """Returns the number of games skipped because they failed to replay."""
+        return self._skipped
+
+    def add_skipped(self, count: int) -> None:
+        """Records games that could not be replayed."""
+        self._skipped += count
+
+    def update(self, columns: "dict[str, np.ndarray]") -> None:
+        """Adds a chunk of per-game feature columns to the aggregates."""
+        self._games += len(columns["plies"])
+        self._results += np.bincount(columns["result"], minlength=len(RESULTS))
+        self._lengths += np.bincount(np.minimum(columns["plies"], MAX_PLIES),
+                                     minlength=MAX_PLIES + 1)
+
+        for color in ("white", "black"):
+            plies = columns[f"first_fairy_ply_{color}"]
+            self._first_fairy[color] += np.bincount(
+                np.minimum(plies[plies >= 0], MAX_PLIES), minlength=MAX_PLIES + 1
+            )
+
+        self._first_type += np.bincount(columns["first_fairy_type"],
+                                        minlength=len(FAIRY_TYPES))
+        self._captures += columns["captured"].sum(axis=0, dtype=np.int64)
+        self._capture_games += (columns["captured"] > 0).sum(axis=0)
+        self._side_captures += (columns["captures_white"].sum(dtype=np.int64),
+                                columns["captures_black"].sum(dtype=np.int64))
+
+    def merge(self, other: "ArchiveStats") -> None:
+        """Adds another set of aggregates to this one."""
+        self._games += other._games
+        self._skipped += other._skipped
+        self._results += other._results
+        self._lengths += other._lengths
+        for color in ("white", "black"):
+            self._first_fairy[color] += other._first_fairy[color]
+        self._first_type += other._first_type
+        self._captures += other._captures
+        self._capture_games += other._capture_games
+        self._side_captures += other._side_captures
+
+    def summary(self) -> dict:
+        """Returns the aggregates as a dictionary of plain Python values."""
+        games = max(self._games, 1)
+        plies = np.arange(MAX_PLIES + 1)
+        cumulative = np.cumsum(self._lengths)
+
+        def percentile(fraction):
+            if not self._games:
+                return 0
+            return int(np.searchsorted(cumulative, fraction * self._games))
+
+        def fairy_stats(histogram):
+            entered = int(histogram.sum())
+            return {
+                "rate": entered / games,
+                "mean_ply": float(histogram @ plies / entered) if entered else None
+            }
+
+        return {
+            "games": self._games,
+            "skipped": self._skipped,
+            "results": {name: int(count) / games
+                        for name, count in zip(RESULTS, self._results)},
+            "length": {
+                "mean": float(self._lengths @ plies / games),
+                "median": percentile(0.5),
+                "p90": percentile(0.9),
+                "histogram": self._lengths.copy()
+            },
+            "fairy_entry": {color: fairy_stats(histogram)
+                            for color, histogram in self._first_fairy.items()},
+            "first_fairy": {name: int(count) / games
+                            for name, count in zip(FAIRY_TYPES, self._first_type)},
+            "captures_per_game": {
+                "white": float(self._side_captures[0] / games),
+                "black": float(self._side_captures[1] / games),
+                **{name: float(count / games)
+                   for name, count in zip(PIECE_TYPES, self._captures)}
+            },
+            "games_with_capture": {name: int(count) / games
+                                   for name, count in zip(PIECE_TYPES, self._capture_games)}
+        }
+
+
+def analyze_file(path: str, chunk_size: int = 4096) -> ArchiveStats:
+    """Streams one game record file into an ArchiveStats."""
+    stats = ArchiveStats()
+    chunks = iter_feature_chunks(path, chunk_size)
+
+    while True:
+        try:
+            stats.update(next(chunks).get_columns())
+        except StopIteration as done:
+            stats.add_skipped(done.value or 0)
+            break
+
+    return stats
+
+
+def analyze_archive(paths: "list[str]", workers: "int | None" = None,
+                    chunk_size: int = 4096) -> ArchiveStats:
+    """Analyzes game record files across a pool of worker processes, one
+    file per task, and merges their aggregates as they complete.
+    """
+    stats = ArchiveStats()
+
+    if workers == 1:
+        for path in paths:
+            stats.merge(analyze_file(path, chunk_size))
+
+        return stats
+
+    with multiprocessing.Pool(workers) as pool:
+        tasks = [(path, chunk_size) for path in paths]
+
+        for partial in pool.imap_unordered(_analyze_task, tasks):
+            stats.merge(partial)
+
+    return stats
+
+
+def _analyze_task(task: "tuple[str, int]") -> ArchiveStats:
+    """Pool entry point for analyze_archive()."""
+    return analyze_file(*task)
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    result = analyze_archive(sys.argv[1:]).summary()
+    result["length"]["histogram"] = result["length"]["histogram"].tolist()
+    print(json.dumps(result, indent=2))
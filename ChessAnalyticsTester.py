@@ -0,0 +1,84 @@
+import os
+import random
+import tempfile
+import unittest
+from ChessEngine import Position, format_move, format_record
+from ChessAnalytics import FeatureChunk, analyze_file, analyze_archive
+
+
+def write_random_games(path, count, seed):
+    """Writes count randomly played game records to path."""
+    rng = random.Random(seed)
+
+    with open(path, "w", encoding="utf-8") as file:
+        for _ in range(count):
+            position = Position()
+            moves = []
+
+            while position.get_winner() is None and len(moves) < 200:
+                move = rng.choice(position.legal_moves())
+                moves.append(format_move(move))
+                position.push(move)
+
+            file.write(format_record(position.get_game_state(), moves) + "\n")
+
+
+class TestFeatureChunk(unittest.TestCase):
+    """Tests per-game feature extraction."""
+    def test_features(self):
+        """Tests features of a short game with a fairy entry."""
+        chunk = FeatureChunk(4)
+        moves = ["e2e4", "d7d5", "d1g4", "c8g4", "H@d1", "g4d1"]
+
+        self.assertTrue(chunk.append("UNFINISHED", moves))
+        self.assertFalse(chunk.append("UNFINISHED", ["e2e5"]))
+
+        columns = chunk.get_columns()
+        self.assertEqual(len(chunk), 1)
+        self.assertEqual(columns["plies"][0], 6)
+        self.assertEqual(columns["first_fairy_ply_white"][0], 4)
+        self.assertEqual(columns["first_fairy_ply_black"][0], -1)
+        self.assertEqual(columns["first_fairy_type"][0], 2)
+        self.assertEqual(columns["captures_black"][0], 2)
+        self.assertEqual(columns["captured"][0].tolist(), [0, 1, 0, 0, 0, 0, 0, 1])
+
+
+class TestArchiveStats(unittest.TestCase):
+    """Tests streaming aggregation over game record files."""
+    def setUp(self):
+        """Writes two small archives of random games."""
+        self._dir = tempfile.TemporaryDirectory()
+        self._paths = [os.path.join(self._dir.name, f"games{i}.txt") for i in range(2)]
+
+        for seed, path in enumerate(self._paths):
+            write_random_games(path, 10, seed)
+
+        with open(self._paths[0], "a", encoding="utf-8") as file:
+            file.write("# comment\n\nWHITE_WON e2e5\n")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_chunked_matches_single(self):
+        """Tests that chunk size and worker count do not change the totals."""
+        whole = analyze_archive(self._paths, workers=1, chunk_size=64).summary()
+        chunked = analyze_archive(self._paths, workers=2, chunk_size=3).summary()
+
+        self.assertEqual(whole["games"], 20)
+        self.assertEqual(whole["skipped"], 1)
+        self.assertEqual(chunked["games"], 20)
+        self.assertEqual(chunked["results"], whole["results"])
+        self.assertEqual(chunked["length"]["median"], whole["length"]["median"])
+        self.assertEqual(chunked["captures_per_game"], whole["captures_per_game"])
+        self.assertEqual(chunked["fairy_entry"], whole["fairy_entry"])
+
+    def test_results(self):
+        """Tests result rates sum to one for decided and unfinished games."""
+        summary = analyze_file(self._paths[1]).summary()
+
+        self.assertAlmostEqual(sum(summary["results"].values()), 1.0)
+        self.assertAlmostEqual(sum(summary["first_fairy"].values()), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
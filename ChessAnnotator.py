@@ -0,0 +1,177 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Batch review of finished games. Each game record is
+#                   replayed on the print-free Position and every ply is scored
+#                   by a search with a fixed node or time budget. Plies that
+#                   lose too much against the engine's choice are flagged as
+#                   blunders, as are plies that pass up a king capture. Files
+#                   are shared out across a process pool and each worker
+#                   streams its annotated games to disk as JSON lines, so
+#                   memory stays bounded however many games there are.
+#
+#                   Usage: python ChessAnnotator.py OUTPUT_DIR FILE [FILE ...]
+#                          [--nodes N] [--movetime SECONDS] [--workers N]
+#                          [--threshold CENTIPAWNS]
+
+import json
+import multiprocessing
+import os
+
+from ChessEngine import (MATE, Position, Searcher, TranspositionTable,
+                         format_move, parse_move, read_records)
+
+
+def annotate_game(moves: "list[str]", searcher: Searcher, nodes: "int | None" = 20000,
+                  movetime: "float | None" = None, threshold: int = 200) -> "list[dict]":
+    """Scores every ply of a game. Each position is searched once; the score
+    of the move played is the negated score of the position it led to, so a
+    ply's loss is how much worse that is than the engine's best move. Returns
+    one dictionary per ply with the move played, the engine's best move and
+    score (centipawns for the side to move), the loss, and any flags:
+    "blunder" when the loss reaches threshold, "missed_king_capture" when a
+    king capture was available but not played. Raises ValueError on an
+    illegal move.
+    """
+    position = Position()
+    plies = []
+    scores = []
+
+    for ply, text in enumerate(moves + [None]):
+        if position.get_winner() is not None:
+            scores.append(-MATE)
+        else:
+            result = searcher.search(position, movetime=movetime, nodes=nodes)
+            scores.append(result.score)
+
+        if text is None:
+            break
+
+        move = parse_move(text)
+
+        if move is None or not position.is_legal(move):
+            raise ValueError(f"illegal move {text!r} at ply {ply}")
+
+        king_captures = [
+            capture for capture in position.capture_moves()
+            if position.get_capture(capture).get_type() == "king"
+        ]
+        flags = []
+
+        if king_captures and move not in king_captures:
+            flags.append("missed_king_capture")
+
+        plies.append({
+            "move": text,
+            "best": format_move(result.move) if result.move is not None else None,
+            "score": result.score,
+            "flags": flags
+        })
+        position.push(move)
+
+    for ply, annotation in enumerate(plies):
+        annotation["loss"] = max(0, scores[ply] + scores[ply + 1])
+
+        if annotation["loss"] >= threshold:
+            annotation["flags"].append("blunder")
+
+    return plies
+
+
+def annotate_file(path: str, output_path: str, nodes: "int | None" = 20000,
+                  movetime: "float | None" = None, threshold: int = 200,
+                  table_size: int = 1 << 18) -> "dict[str, int]":
+    """Annotates every game in a record file, writing one JSON line per game
+    to output_path as soon as it is done. Games with illegal moves are
+    written with an "error" instead of plies. Returns counts of games,
+    errors, plies, blunders, and missed king captures.
+    """
+    searcher = Searcher(TranspositionTable(table_size))
+    counts = {"games": 0, "errors": 0, "plies": 0, "blunders": 0,
+              "missed_king_captures": 0}
+
+    with open(output_path, "w", encoding="utf-8") as output:
+        for index, (result, moves) in enumerate(read_records(path)):
+            record = {"source": path, "game": index, "result": result}
+            counts["games"] += 1
+
+            try:
+                record["plies"] = annotate_game(moves, searcher, nodes,
+                                                movetime, threshold)
+            except ValueError as error:
+                record["error"] = str(error)
+                counts["errors"] += 1
+            else:
+                counts["plies"] += len(record["plies"])
+                for annotation in record["plies"]:
+                    counts["blunders"] += "blunder" in annotation["flags"]
+                    counts["missed_king_captures"] += (
+                        "missed_king_capture" in annotation["flags"])
+
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+    return counts
+
+
+def annotate_archive(paths: "list[str]", output_dir: str, workers: "int | None" = None,
+                     **options) -> "dict[str, int]":
+    """Annotates game record files across a pool of worker processes, one
+    file per task, writing OUTPUT_DIR/<name>.annotated.jsonl for each input
+    file (see output_paths()). Options are passed to annotate_file().
+    Returns the summed counts.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [
+        (path, output_path, options)
+        for path, output_path in zip(paths, output_paths(paths, output_dir))
+    ]
+    totals = {}
+
+    with multiprocessing.Pool(workers) as pool:
+        for counts in pool.imap_unordered(_annotate_task, tasks):
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+
+    return totals
+
+
+def output_paths(paths: "list[str]", output_dir: str) -> "list[str]":
+    """Returns the output path of each input file in output_dir. A file's
+    output is named after its base name plus ".annotated.jsonl"; when
+    several inputs share a base name, each also gets its position in paths,
+    so no two workers write the same file.
+    """
+    names = [os.path.basename(path) for path in paths]
+
+    return [
+        os.path.join(output_dir, (name if names.count(name) == 1 else f"{name}.{index}")
+                     + ".annotated.jsonl")
+        for index, name in enumerate(names)
+    ]
+
+
+def _annotate_task(task: "tuple[str, str, dict]") -> "dict[str, int]":
+    """Pool entry point for annotate_archive()."""
+    path, output_path, options = task
+
+    return annotate_file(path, output_path, **options)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Annotate game record files.")
+    parser.add_argument("output_dir")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--movetime", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(annotate_archive(
+        args.files, args.output_dir, args.workers,
+        nodes=None if args.movetime else args.nodes,
+        movetime=args.movetime, threshold=args.threshold
+    )))
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from ChessEngine import Searcher, format_record
+from ChessAnnotator import annotate_game, annotate_archive, output_paths
+
+
+class TestAnnotateGame(unittest.TestCase):
+    """Tests scoring and flagging plies of a game."""
+    def test_missed_king_capture(self):
+        """Tests flagging a ply that ignores a capturable king."""
+        moves = ["e2e4", "e7e5", "e1e2", "e8e7", "e2f3", "e7e8", "f3f4", "a7a6"]
+        plies = annotate_game(moves, Searcher(), nodes=3000)
+
+        self.assertEqual(len(plies), 8)
+        self.assertIn("missed_king_capture", plies[7]["flags"])
+        self.assertIn("blunder", plies[7]["flags"])
+        self.assertEqual(plies[7]["best"], "e5f4")
+
+        # Walking the king into the pawn's reach was the original blunder
+        self.assertIn("blunder", plies[6]["flags"])
+        self.assertEqual(plies[0]["flags"], [])
+
+    def test_hanging_queen(self):
+        """Tests flagging a move that gives away the queen."""
+        plies = annotate_game(["e2e4", "d7d5", "d1g4", "c8g4"], Searcher(), nodes=3000)
+
+        self.assertIn("blunder", plies[2]["flags"])
+        self.assertNotIn("blunder", plies[3]["flags"])
+        self.assertGreater(plies[2]["loss"], 500)
+
+    def test_illegal_move(self):
+        """Tests that an illegal move raises ValueError."""
+        with self.assertRaises(ValueError):
+            annotate_game(["e2e5"], Searcher(), nodes=100)
+
+
+class TestAnnotateArchive(unittest.TestCase):
+    """Tests annotating record files across worker processes."""
+    def test_archive(self):
+        """Tests output files and totals for two record files."""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index, games in enumerate((["e2e4 e7e5", "d2d4"], ["e2e5"])):
+                path = os.path.join(directory, f"games{index}.txt")
+                with open(path, "w", encoding="utf-8") as file:
+                    for moves in games:
+                        file.write(format_record("UNFINISHED", moves.split()) + "\n")
+                paths.append(path)
+
+            output_dir = os.path.join(directory, "out")
+            totals = annotate_archive(paths, output_dir, workers=2, nodes=500)
+
+            self.assertEqual(totals["games"], 3)
+            self.assertEqual(totals["errors"], 1)
+            self.assertEqual(totals["plies"], 3)
+
+            with open(os.path.join(output_dir, "games0.txt.annotated.jsonl"),
+                      encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+
+            self.assertEqual([len(record["plies"]) for record in records], [2, 1])
+            self.assertEqual(records[0]["plies"][0]["move"], "e2e4")
+
+    def test_output_paths_are_unique(self):
+        """Tests that inputs sharing a base name get separate output files."""
+        paths = [os.path.join("a", "games.txt"), os.path.join("b", "games.txt"),
+                 os.path.join("a", "other.txt")]
+
+        self.assertEqual(
+            [os.path.basename(path) for path in output_paths(paths, "out")],
+            ["games.txt.0.annotated.jsonl", "games.txt.1.annotated.jsonl",
+             "other.txt.annotated.jsonl"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,385 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Spectator fan-out for live games. Instead of rendering the
+#                   full board for every watcher on every move, a Broadcaster
+#                   encodes each ply once as a compact binary delta frame and
+#                   hands the same bytes object to every subscriber's queue.
+#                   Keyframes holding the whole position are sent every few
+#                   plies for late joiners. Slow consumers have bounded queues
+#                   that collapse to the latest keyframe when they overflow.
+#
+#                   Frame layout (big-endian):
+#                     kind (b"K" or b"D"), ply (2 bytes), flags (1 byte: game
+#                     state in bits 0-1, black to move in bit 2), reserves (1
+#                     byte: white falcon, white hunter, black falcon, black
+#                     hunter in bits 0-3), white points, black points,
+#                     move length and move text (ASCII, empty for keyframes),
+#                   then for a keyframe 64 piece codes (a8 first), or for a
+#                   delta a change count and (square, piece code) pairs.
+
+import collections
+import struct
+import threading
+
+from ChessVar import ChessVar, GameHistory
+from ChessEngine import PIECE_CODES
+
+
+CODE_PIECES = {code: piece for piece, code in PIECE_CODES.items()}
+
+GAME_STATES = ("UNFINISHED", "WHITE_WON", "BLACK_WON", "DRAW")
+RESERVE_BITS = {
+    ("white", "falcon"): 1, ("white", "hunter"): 2,
+    ("black", "falcon"): 4, ("black", "hunter"): 8
+}
+
+HEADER = struct.Struct(">cHBBBBB")
+
+
+def _piece_code(piece) -> int:
+    """Returns the frame code of a ChessPiece or None."""
+    if piece is None:
+        return 0
+
+    return PIECE_CODES[piece.get_color(), piece.get_type()]
+
+
+def _header(kind: bytes, ply: int, state: str, turn: str,
+            reserves: "dict[str, tuple[str, ...]]", points: "dict[str, int]",
+            move: str) -> bytes:
+    """Encodes the fields shared by keyframes and delta frames."""
+    flags = GAME_STATES.index(state) | (4 if turn == "black" else 0)
+    reserve_bits = 0
+
+    for color, fairies in reserves.items():
+        for fairy in fairies:
+            reserve_bits |= RESERVE_BITS[color, fairy]
+
+    text = move.encode("ascii")
+
+    return HEADER.pack(kind, ply, flags, reserve_bits, points["white"],
+                       points["black"], len(text)) + text
+
+
+def encode_keyframe(history: GameHistory, ply: int, state: str = "UNFINISHED") -> bytes:
+    """Encodes the position after ply plies of a history as a keyframe."""
+    position = history.seek(ply)
+    header = _header(b"K", ply, state, position.turn, position.reserves,
+                     position.points, "")
+
+    return header + bytes(_piece_code(piece) for piece in position.squares)
+
+
+def encode_delta(history: GameHistory, ply: int, state: str = "UNFINISHED") -> bytes:
+    """Encodes ply number ply (counting from 1) of a history as a delta
+    frame holding the move text and the new contents of the squares it
+    changed.
+    """
+    move, changes, _, turn = history.get_delta(ply - 1)
+    position_after = history.seek(ply)
+    header = _header(b"D", ply, state, turn, position_after.reserves,
+                     position_after.points, move)
+    body = bytearray([len(changes)])
+
+    for square, _, after in changes:
+        body += bytes((square, _piece_code(after)))
+
+    return header + bytes(body)
+
+
+def decode_frame(frame: bytes) -> dict:
+    """Decodes a frame into a dictionary with its "kind" ("keyframe" or
+    "delta"), "ply", "state", "turn", "reserves", "points", and "move", plus
+    "squares" (64 (color, type) pairs or None) for a keyframe or "changes"
+    ((square, (color, type) or None) pairs) for a delta. Raises ValueError
+    if the frame is malformed.
+    """
+    try:
+        kind, ply, flags, reserve_bits, white_points, black_points, length = (
+            HEADER.unpack_from(frame))
+    except struct.error as error:
+        raise ValueError("truncated frame") from error
+
+    offset = HEADER.size + length
+    decoded = {
+        "ply": ply,
+        "state": GAME_STATES[flags & 3],
+        "turn": "black" if flags & 4 else "white",
+        "reserves": {
+            color: tuple(fairy for fairy in ("falcon", "hunter")
+                         if reserve_bits & RESERVE_BITS[color, fairy])
+            for color in ("white", "black")
+        },
+        "points": {"white": white_points, "black": black_points},
+        "move": bytes(frame[HEADER.size:offset]).decode("ascii")
+    }
+
+    if kind == b"K":
+        if len(frame) != offset + 64:
+            raise ValueError("malformed keyframe")
+
+        decoded["kind"] = "keyframe"
+        decoded["squares"] = [CODE_PIECES.get(code) for code in frame[offset:]]
+    elif kind == b"D":
+        if len(frame) <= offset or len(frame) != offset + 1 + 2 * frame[offset]:
+            raise ValueError("malformed delta frame")
+
+        decoded["kind"] = "delta"
+        decoded["changes"] = [
+            (frame[index], CODE_PIECES.get(frame[index + 1]))
+            for index in range(offset + 1, len(frame), 2)
+        ]
+    else:
+        raise ValueError("unknown frame kind")
+
+    return decoded
+
+
+class Subscription:
+    """A spectator's bounded queue of frames. Frames are shared bytes
+    objects; nothing is copied per subscriber.
+    """
+    def __init__(self, queue_size: int) -> None:
+        self._frames = collections.deque()
+        self._queue_size = queue_size
+        self._ready = threading.Condition()
+        self._dropped = 0
+        self._closed = False
+
+    def get(self, timeout: "float | None" = None) -> "bytes | None":
+        """Returns the next frame, waiting up to timeout seconds (forever if
+        None) for one to arrive. Returns None on timeout or once the
+        subscription is closed and empty.
+        """
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._frames or self._closed, timeout):
+                return None
+
+            return self._frames.popleft() if self._frames else None
+
+    def get_pending(self) -> int:
+        """Returns the number of frames waiting in the queue."""
+        return len(self._frames)
+
+    def get_dropped(self) -> int:
+        """Returns the number of frames dropped because the queue was full."""
+        return self._dropped
+
+    def is_closed(self) -> bool:
+        """Returns True if the subscription has been closed."""
+        return self._closed
+
+    def _put(self, frame: bytes, keyframe) -> bool:
+        """Queues a frame. If the queue is full, drops everything queued and
+        queues a keyframe of the latest position instead; keyframe is called
+        to get it (and encodes it at most once per ply for all subscribers).
+        Returns True if the queue was collapsed to that keyframe, in which
+        case the caller must not queue the rest of its batch.
+        """
+        with self._ready:
+            collapsed = len(self._frames) >= self._queue_size
+
+            if collapsed:
+                self._dropped += len(self._frames) + 1
+                self._frames.clear()
+                frame = keyframe()
+
+            self._frames.append(frame)
+            self._ready.notify()
+
+        return collapsed
+
+    def _put_all(self, frames: "list[bytes]", keyframe) -> None:
+        """Queues a batch of frames with _put(), dropping the rest of the
+        batch once the queue collapses to the latest keyframe, which already
+        covers them.
+        """
+        for index, frame in enumerate(frames):
+            if self._put(frame, keyframe):
+                self._dropped += len(frames) - index - 1
+                break
+
+    def _close(self) -> None:
+        """Closes the subscription, waking any waiting reader."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+
+class Broadcaster:
+    """Broadcasts a ChessVar game to subscribed spectators. Call update()
+    after each move or fairy entry (or any number of them) to publish the
+    new plies from the game's history.
+
+    Every ply becomes one delta frame, and every keyframe_interval plies a
+    keyframe follows it. New subscribers first receive the latest keyframe
+    and the deltas since. A subscriber whose queue holds queue_size frames
+    loses them all and is sent a keyframe of the current position instead.
+    """
+    def __init__(self, game: ChessVar, keyframe_interval: int = 32,
+                 queue_size: int = 64) -> None:
+        self._game = game
+        self._history = game.get_history()
+        self._keyframe_interval = keyframe_interval
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._ply = self._history.get_length()
+        self._state = game.get_game_state()
+
+        # The latest keyframe and the deltas published since, for joiners;
+        # and a keyframe of the current ply for overflowing subscribers
+        self._keyframe = encode_keyframe(self._history, self._ply, self._state)
+        self._since_keyframe = []
+        self._current = (self._ply, self._keyframe)
+
+    def get_subscriber_count(self) -> int:
+        """Returns the number of subscribers."""
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Returns a new Subscription, already holding the latest keyframe
+        and the delta frames published since.
+        """
+        subscription = Subscription(self._queue_size)
+
+        with self._lock:
+            subscription._put_all([self._keyframe] + self._since_keyframe,
+                                  self._current_keyframe)
+
+            self._subscribers.append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Removes and closes a subscription."""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+        subscription._close()
+
+    def close(self) -> None:
+        """Removes and closes every subscription."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+
+        for subscription in subscribers:
+            subscription._close()
+
+    def update(self) -> int:
+        """Publishes the plies played since the last update, plus a final
+        frame if only the game state changed. Returns the number of frames
+        sent to each subscriber.
+        """
+        with self._lock:
+            length = self._history.get_length()
+            state = self._game.get_game_state()
+            frames = []
+
+            while self._ply < length:
+                self._ply += 1
+                final = state if self._ply == length else "UNFINISHED"
+                frames.append(encode_delta(self._history, self._ply, final))
+                self._since_keyframe.append(frames[-1])
+
+                if self._ply % self._keyframe_interval == 0 or final != "UNFINISHED":
+                    self._keyframe = encode_keyframe(self._history, self._ply, final)
+                    self._since_keyframe = []
+                    frames.append(self._keyframe)
+                    self._current = (self._ply, self._keyframe)
+
+            if not frames and state != self._state:
+                self._keyframe = encode_keyframe(self._history, self._ply, state)
+                self._since_keyframe = []
+                self._current = (self._ply, self._keyframe)
+                frames.append(self._keyframe)
+
+            self._state = state
+
+            for subscription in self._subscribers:
+                subscription._put_all(frames, self._current_keyframe)
+
+        return len(frames)
+
+    def _current_keyframe(self) -> bytes:
+        """Returns a keyframe of the latest published ply, encoding it only
+        the first time it is needed.
+        """
+        ply, keyframe = self._current
+
+        if ply != self._ply:
+            keyframe = encode_keyframe(self._history, self._ply, self._state)
+            self._current = (self._ply, keyframe)
+
+        return keyframe
+
+
+class SpectatorView:
+    """A spectator's copy of the game, rebuilt from frames. Delta frames are
+    applied only on top of the ply before them, so after a gap the view
+    waits for the next keyframe.
+    """
+    def __init__(self) -> None:
+        self._squares = None
+        self._ply = None
+        self._state = "UNFINISHED"
+        self._turn = "white"
+        self._reserves = {}
+        self._points = {}
+        self._last_move = None
+
+    def apply(self, frame: bytes) -> bool:
+        """Applies a frame and returns True, or returns False if it is a
+        delta that does not follow the current ply.
+        """
+        decoded = decode_frame(frame)
+
+        if decoded["kind"] == "keyframe":
+            self._squares = decoded["squares"]
+        elif self._ply is None or decoded["ply"] != self._ply + 1:
+            return False
+        else:
+            for square, piece in decoded["changes"]:
+                self._squares[square] = piece
+
+            self._last_move = decoded["move"]
+
+        self._ply = decoded["ply"]
+        self._state = decoded["state"]
+        self._turn = decoded["turn"]
+        self._reserves = decoded["reserves"]
+        self._points = decoded["points"]
+
+        return True
+
+    def get(self, row: int, col: int) -> "tuple[str, str] | None":
+        """Returns the (color, type) of the piece at the specified
+        coordinates, or None.
+        """
+        return self._squares[row * 8 + col]
+
+    def get_ply(self) -> "int | None":
+        """Returns the ply shown, or None before the first keyframe."""
+        return self._ply
+
+    def get_game_state(self) -> str:
+        """Returns the game state string."""
+        return self._state
+
+    def get_turn(self) -> str:
+        """Returns the color to move."""
+        return self._turn
+
+    def get_reserves(self) -> "dict[str, tuple[str, ...]]":
+        """Returns each color's fairy pieces in reserve."""
+        return self._reserves
+
+    def get_points(self) -> "dict[str, int]":
+        """Returns each color's fairy points."""
+        return self._points
+
+    def get_last_move(self) -> "str | None":
+        """Returns the text of the last move applied from a delta frame."""
+        return self._last_move
@@ -0,0 +1,217 @@
+import contextlib
+import io
+import random
+import unittest
+from ChessVar import ChessVar
+from ChessBroadcast import (Broadcaster, SpectatorView, decode_frame,
+                            encode_keyframe)
+
+
+def new_game():
+    """Returns a new game, discarding its output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ChessVar()
+
+
+def play_random(game, rng):
+    """Plays one random move or fairy entry that does not capture a king.
+    Returns False if there is none.
+    """
+    player = game.get_current_player()
+    color = player.get_color()
+    board = game._board
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if player.get_reserve() and rng.random() < 0.5:
+            fairy = player.get_reserve()[0]
+            token = fairy[0].upper() if color == "white" else fairy[0]
+            rank = rng.choice("12" if color == "white" else "78")
+
+            if game.enter_fairy_piece(token, rng.choice("abcdefgh") + rank):
+                return True
+
+        moves = [
+            ((row, col), dest)
+            for row in range(8) for col in range(8)
+            if board.get(row, col) is not None
+            and board.get(row, col).get_color() == color
+            for dest in board.get_valid_moves(row, col)
+            if board.get(*dest) is None or board.get(*dest).get_type() != "king"
+        ]
+
+        if not moves:
+            return False
+
+        (row, col), (dest_row, dest_col) = rng.choice(moves)
+
+        return game.make_move(f"{chr(97 + col)}{8 - row}",
+                              f"{chr(97 + dest_col)}{8 - dest_row}")
+
+
+def assert_view_matches(test, view, game):
+    """Checks a spectator view against the game's current position."""
+    state = game.get_history().seek(game.get_history().get_length())
+
+    test.assertEqual(view.get_ply(), game.get_history().get_length())
+    test.assertEqual(view.get_turn(), state.turn)
+    test.assertEqual(view.get_reserves(), state.reserves)
+    test.assertEqual(view.get_points(), state.points)
+    test.assertEqual(view.get_game_state(), game.get_game_state())
+
+    for row in range(8):
+        for col in range(8):
+            piece = state.get(row, col)
+            test.assertEqual(view.get(row, col),
+                             None if piece is None
+                             else (piece.get_color(), piece.get_type()))
+
+
+class TestBroadcast(unittest.TestCase):
+    """Tests the spectator broadcaster."""
+    def test_frames(self):
+        """Tests that frames decode to the position and move played."""
+        game = new_game()
+        broadcaster = Broadcaster(game)
+        subscription = broadcaster.subscribe()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.make_move("e2", "e4")
+        self.assertEqual(broadcaster.update(), 1)
+
+        keyframe = decode_frame(subscription.get(0))
+        self.assertEqual(keyframe["kind"], "keyframe")
+        self.assertEqual(keyframe["squares"][60], ("white", "king"))
+
+        frame = subscription.get(0)
+        delta = decode_frame(frame)
+        self.assertEqual(delta["kind"], "delta")
+        self.assertEqual((delta["ply"], delta["move"], delta["turn"]), (1, "e2e4", "black"))
+        self.assertEqual(sorted(delta["changes"]), [(36, ("white", "pawn")), (52, None)])
+
+        # A delta is a small fraction of a rendered board
+        with contextlib.redirect_stdout(io.StringIO()) as rendered:
+            game.print_board()
+        self.assertLess(len(frame) * 20, len(rendered.getvalue().encode()))
+
+        for bad in (b"", b"X" + frame[1:], frame[:-1]):
+            with self.assertRaises(ValueError):
+                decode_frame(bad)
+
+    def test_shared_frames(self):
+        """Tests that every subscriber receives the same frame objects."""
+        game = new_game()
+        broadcaster = Broadcaster(game)
+        subscriptions = [broadcaster.subscribe() for _ in range(50)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.make_move("e2", "e4")
+        broadcaster.update()
+
+        for _ in range(2):
+            frames = [subscription.get(0) for subscription in subscriptions]
+            self.assertTrue(all(frame is frames[0] for frame in frames))
+
+        self.assertIsNone(subscriptions[0].get(0))
+
+    def test_spectators(self):
+        """Tests that fast, slow, and late spectators all follow the game."""
+        rng = random.Random(39)
+        game = new_game()
+        broadcaster = Broadcaster(game, keyframe_interval=8, queue_size=6)
+        fast = broadcaster.subscribe()
+        slow = broadcaster.subscribe()
+        fast_view = SpectatorView()
+        late = None
+
+        for ply in range(120):
+            if not play_random(game, rng):
+                break
+
+            broadcaster.update()
+
+            while fast.get_pending():
+                self.assertTrue(fast_view.apply(fast.get(0)))
+
+            assert_view_matches(self, fast_view, game)
+
+            if ply == 50:
+                late = broadcaster.subscribe()
+
+        self.assertEqual(fast.get_dropped(), 0)
+        self.assertGreater(slow.get_dropped(), 0)
+        self.assertLessEqual(slow.get_pending(), 6)
+
+        for subscription in (slow, late):
+            view = SpectatorView()
+
+            while subscription.get_pending():
+                view.apply(subscription.get(0))
+
+            assert_view_matches(self, view, game)
+
+    def test_overflow_mid_batch(self):
+        """Tests that a queue overflowing partway through one update holds
+        only the current keyframe afterward.
+        """
+        rng = random.Random(7)
+        game = new_game()
+        broadcaster = Broadcaster(game, keyframe_interval=8, queue_size=7)
+        subscription = broadcaster.subscribe()
+        subscription.get(0)
+
+        for _ in range(12):
+            self.assertTrue(play_random(game, rng))
+        broadcaster.update()
+
+        frames = []
+        while subscription.get_pending():
+            frames.append(decode_frame(subscription.get(0)))
+
+        self.assertEqual([(frame["kind"], frame["ply"]) for frame in frames],
+                         [("keyframe", 12)])
+        self.assertEqual(subscription.get_dropped(), 13)
+
+    def test_game_over(self):
+        """Tests that the final frame carries the result."""
+        game = new_game()
+        broadcaster = Broadcaster(game)
+        subscription = broadcaster.subscribe()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for orig, dest in (("e2", "e4"), ("e7", "e5"), ("e1", "e2"), ("e8", "e7"),
+                               ("e2", "f3"), ("e7", "e8"), ("f3", "f4"), ("e5", "f4")):
+                game.make_move(orig, dest)
+        broadcaster.update()
+
+        view = SpectatorView()
+        while subscription.get_pending():
+            view.apply(subscription.get(0))
+
+        self.assertEqual(view.get_game_state(), "BLACK_WON")
+        self.assertEqual(view.get_last_move(), "e5f4")
+
+        broadcaster.close()
+        self.assertTrue(subscription.is_closed())
+        self.assertIsNone(subscription.get())
+        self.assertEqual(broadcaster.get_subscriber_count(), 0)
+
+    def test_late_keyframe(self):
+        """Tests that a late joiner starts from the latest keyframe."""
+        game = new_game()
+        broadcaster = Broadcaster(game, keyframe_interval=2)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for orig, dest in (("e2", "e4"), ("e7", "e5"), ("g1", "f3")):
+                game.make_move(orig, dest)
+        broadcaster.update()
+
+        subscription = broadcaster.subscribe()
+        frames = [subscription.get(0), subscription.get(0)]
+
+        self.assertEqual(frames[0], encode_keyframe(game.get_history(), 2))
+        self.assertEqual(decode_frame(frames[1])["move"], "g1f3")
+        self.assertIsNone(subscription.get(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,1385 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Engine support for Falcon-Hunter chess. Position is a
+#                   print-free game state with push/pop for search, Searcher
+#                   runs an iterative deepening alpha-beta search over it, and
+#                   TranspositionTable caches results in a flat 64-bit slot
+#                   array that SharedTranspositionTable places in shared memory
+#                   so parallel_search() workers can share it without locks.
+#                   Ponderer searches the expected reply in the background
+#                   while the opponent is thinking.
+
+import copy
+import json
+import multiprocessing
+import queue
+import random
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+from ChessVar import ZOBRIST, Board, ChessPiece, Player
+
+
+# Moves are encoded as origin * 64 + destination, where squares are numbered
+# row * 8 + col. Fairy entries use the pseudo-origins below.
+FALCON_DROP = 64
+HUNTER_DROP = 65
+DROP_ORIGINS = {"falcon": FALCON_DROP, "hunter": HUNTER_DROP}
+DROP_FAIRIES = {FALCON_DROP: "falcon", HUNTER_DROP: "hunter"}
+MOVE_COUNT = 66 * 64
+
+MATE = 100000
+INFINITY = 1000000
+
+# Pieces whose capture earns their owner a fairy point
+POINT_PIECES = frozenset({"queen", "rook", "bishop", "knight"})
+
+# Every piece type, in the order used by feature and frame encodings
+PIECE_TYPES = ("king", "queen", "rook", "bishop", "knight", "pawn", "falcon", "hunter")
+
+# Piece codes: 0 for an empty square, then white pieces 1-8, black pieces 9-16
+PIECE_CODES = {
+    (color, piece_type): index * len(PIECE_TYPES) + offset + 1
+    for index, color in enumerate(("white", "black"))
+    for offset, piece_type in enumerate(PIECE_TYPES)
+}
+
+
+def _default_piece_square() -> "dict[str, list[int]]":
+    """Builds the default piece-square tables, indexed by square from white's
+    point of view (a8 = 0, h1 = 63). Minor and fairy pieces prefer the centre
+    and pawns are rewarded for advancing.
+    """
+    center = [
+        -(abs(2 * row - 7) + abs(2 * col - 7)) * 2 + 14
+        for row in range(8) for col in range(8)
+    ]
+    advance = [(6 - row) * 6 if 0 < row < 7 else 0
+               for row in range(8) for _ in range(8)]
+
+    return {
+        "king": [0] * 64,
+        "queen": [value // 2 for value in center],
+        "rook": [0] * 64,
+        "bishop": center[:],
+        "knight": [value * 2 for value in center],
+        "pawn": advance,
+        "falcon": center[:],
+        "hunter": center[:]
+    }
+
+
+# Evaluation weights in centipawns. "reserve" scores a fairy piece still in
+# reserve: index 0 while its owner lacks the points to enter it, index 1 once
+# it may enter. "pawn_structure" scores each doubled, isolated, and passed
+# pawn (passed pawns cannot promote here, but still cramp the enemy).
+WEIGHTS = {
+    "material": {
+        "king": 0, "queen": 900, "rook": 500, "bishop": 330, "knight": 310,
+        "pawn": 100, "falcon": 420, "hunter": 420
+    },
+    "piece_square": _default_piece_square(),
+    "reserve": [300, 380],
+    "pawn_structure": {"doubled": -15, "isolated": -10, "passed": 20}
+}
+
+
+def load_weights(path: str) -> None:
+    """Loads evaluation weights from a JSON file shaped like WEIGHTS (as
+    written by ChessTuner.py) and updates WEIGHTS in place. Sections or
+    entries missing from the file keep their current values. Raises
+    ValueError on an unknown name or a value of the wrong shape. Clear any
+    EvalCache afterward, since it holds terms computed with the old weights.
+    """
+    with open(path, encoding="utf-8") as file:
+        loaded = json.load(file)
+
+    if not isinstance(loaded, dict):
+        raise ValueError("weights file must hold an object")
+
+    updated = copy.deepcopy(WEIGHTS)
+
+    for section, values in loaded.items():
+        if section not in updated:
+            raise ValueError(f"unknown weight section {section!r}")
+
+        current = updated[section]
+
+        if isinstance(current, list):
+            if not isinstance(values, list) or len(values) != len(current):
+                raise ValueError(f"{section} must be a list of {len(current)} numbers")
+            updated[section] = [int(value) for value in values]
+            continue
+
+        if not isinstance(values, dict):
+            raise ValueError(f"{section} must be an object")
+
+        for name, value in values.items():
+            if name not in current:
+                raise ValueError(f"unknown weight {section}.{name}")
+
+            if isinstance(current[name], list):
+                if not isinstance(value, list) or len(value) != 64:
+                    raise ValueError(f"{section}.{name} must be a list of 64 numbers")
+                current[name] = [int(entry) for entry in value]
+            else:
+                current[name] = int(value)
+
+    WEIGHTS.update(updated)
+
+
+def square_name(square: int) -> str:
+    """Converts a square number (row * 8 + col) to algebraic notation."""
+    return "abcdefgh"[square % 8] + str(8 - square // 8)
+
+
+def square_number(name: str) -> "int | None":
+    """Converts a square in algebraic notation to its number (row * 8 + col),
+    or returns None if it is not on the board.
+    """
+    if (not isinstance(name, str) or len(name) != 2
+        or name[0] not in "abcdefgh" or name[1] not in "12345678"
+    ):
+        return None
+
+    return (8 - int(name[1])) * 8 + ord(name[0]) - 97
+
+
+def format_move(move: int) -> str:
+    """Converts an encoded move to text: "e2e4" for a move and "F@e2" or
+    "H@e2" for a falcon or hunter entry.
+    """
+    orig, dest = divmod(move, 64)
+
+    if orig in DROP_FAIRIES:
+        return f"{DROP_FAIRIES[orig][0].upper()}@{square_name(dest)}"
+
+    return square_name(orig) + square_name(dest)
+
+
+def parse_move(text: str) -> "int | None":
+    """Converts move text (see format_move()) to an encoded move, or returns
+    None if the text is malformed. Legality is not checked.
+    """
+    text = text.strip()
+
+    if len(text) == 4 and text[1] == "@" and text[0].lower() in "fh":
+        dest = square_number(text[2:].lower())
+        orig = FALCON_DROP if text[0].lower() == "f" else HUNTER_DROP
+    elif len(text) == 4:
+        orig = square_number(text[:2].lower())
+        dest = square_number(text[2:].lower())
+    else:
+        return None
+
+    if orig is None or dest is None:
+        return None
+
+    return orig * 64 + dest
+
+
+class Position:
+    """Represents a game state for search and replay. Mirrors the rules
+    enforced by ChessVar, including its optional draw adjudication, but never
+    prints, and supports undoing moves with pop(). Moves are encoded integers
+    (see format_move()).
+    """
+    def __init__(self, repetition_limit: "int | None" = None,
+                 no_capture_limit: "int | None" = None,
+                 ply_limit: "int | None" = None) -> None:
+        self._board = Board()
+        self._players = {"white": Player("white"), "black": Player("black")}
+        self._color = "white"
+        self._winner = None
+        self._history = []
+
+        self._repetition_limit = repetition_limit
+        self._no_capture_limit = no_capture_limit
+        self._ply_limit = ply_limit
+        self._quiet_plies = 0
+        self._positions = {self.get_hash(): 1}
+
+    def _load(self, grid: "list[list[ChessPiece | None]]", color: str,
+              reserves: "dict[str, list[str]]", points: "dict[str, int]") -> None:
+        """Replaces the starting setup with the given pieces, side to move,
+        reserves, and fairy points. Used by parse_position().
+        """
+        for row in range(8):
+            for col in range(8):
+                self._board.set(row, col, grid[row][col])
+
+        for color_name, player in self._players.items():
+            for fairy in ("falcon", "hunter"):
+                if fairy not in reserves[color_name]:
+                    player.remove_from_reserve(fairy)
+
+            for _ in range(points[color_name]):
+                player.increment_fairy_points()
+
+        self._color = color
+        self._positions = {self.get_hash(): 1}
+
+    def get_board(self) -> Board:
+        """Returns the position's board."""
+        return self._board
+
+    def get_player(self, color: str) -> Player:
+        """Returns the player of the given color."""
+        return self._players[color]
+
+    def get_color(self) -> str:
+        """Returns the color of the side to move."""
+        return self._color
+
+    def get_winner(self) -> "str | None":
+        """Returns the color of the winner, if a king has been captured."""
+        return self._winner
+
+    def get_game_state(self) -> str:
+        """Returns a string declaring the game's current win state, as
+        ChessVar.get_game_state() does.
+        """
+        if self._winner == "white":
+            return "WHITE_WON"
+
+        if self._winner == "black":
+            return "BLACK_WON"
+
+        if self.get_draw() is not None:
+            return "DRAW"
+
+        return "UNFINISHED"
+
+    def get_draw(self) -> "str | None":
+        """Returns the reason the game is drawn under the position's draw
+        rules ("repetition", "move limit", or "ply limit"), or None.
+        """
+        if self._winner is not None:
+            return None
+
+        if (self._repetition_limit is not None
+            and self._positions.get(self.get_hash(), 0) >= self._repetition_limit
+        ):
+            return "repetition"
+
+        if (self._no_capture_limit is not None
+            and self._quiet_plies >= self._no_capture_limit
+        ):
+            return "move limit"
+
+        if self._ply_limit is not None and len(self._history) >= self._ply_limit:
+            return "ply limit"
+
+        return None
+
+    def is_repetition(self) -> bool:
+        """Returns whether the current position occurred earlier in the game."""
+        return self._positions.get(self.get_hash(), 0) > 1
+
+    def get_ply(self) -> int:
+        """Returns the number of moves played with push()."""
+        return len(self._history)
+
+    def get_last_move(self) -> "int | None":
+        """Returns the last move played with push(), if any."""
+        return self._history[-1][0] if self._history else None
+
+    def get_hash(self) -> int:
+        """Returns the Zobrist hash of the position."""
+        key = (self._board.get_hash() ^ self._players["white"].get_hash()
+               ^ self._players["black"].get_hash())
+
+        return key ^ ZOBRIST["black"] if self._color == "black" else key
+
+    def can_enter(self, fairy: str) -> bool:
+        """Returns whether the side to move may enter the given fairy piece."""
+        player = self._players[self._color]
+        reserve = player.get_reserve()
+        points = player.get_fairy_points()
+
+        return (fairy in reserve
+                and (len(reserve) == 2 and points >= 1
+                     or len(reserve) == 1 and points >= 2))
+
+    def legal_moves(self) -> "list[int]":
+        """Returns the encoded moves available to the side to move."""
+        if self._winner is not None or self.get_draw() is not None:
+            return []
+
+        board = self._board
+        color = self._color
+        moves = []
+
+        for row in range(8):
+            for col in range(8):
+                piece = board.get(row, col)
+
+                if piece is not None and piece.get_color() == color:
+                    orig = (row * 8 + col) * 64
+                    moves.extend(orig + r * 8 + c
+                                 for r, c in board.get_valid_moves(row, col))
+
+        home = (6, 7) if color == "white" else (0, 1)
+
+        for fairy, drop in DROP_ORIGINS.items():
+            if self.can_enter(fairy):
+                moves.extend(drop * 64 + row * 8 + col
+                             for row in home for col in range(8)
+                             if board.get(row, col) is None)
+
+        return moves
+
+    def capture_moves(self) -> "list[int]":
+        """Returns the encoded captures available to the side to move, read
+        from the board's attack maps instead of generating every move.
+        """
+        if self._winner is not None or self.get_draw() is not None:
+            return []
+
+        board = self._board
+        color = self._color
+        moves = []
+
+        for row in range(8):
+            for col in range(8):
+                piece = board.get(row, col)
+
+                if piece is not None and piece.get_color() != color:
+                    dest = row * 8 + col
+                    moves.extend((r * 8 + c) * 64 + dest
+                                 for r, c in board.attackers_of(row, col, color))
+
+        return moves
+
+    def is_legal(self, move: int) -> bool:
+        """Returns whether an encoded move is legal for the side to move."""
+        if self._winner is not None or self.get_draw() is not None:
+            return False
+
+        return self.is_valid_move(move)
+
+    def is_valid_move(self, move: int) -> bool:
+        """Returns whether an encoded move is valid on the board for the
+        side to move, without checking whether the game is over.
+        """
+        if not 0 <= move < MOVE_COUNT:
+            return False
+
+        orig, dest = divmod(move, 64)
+        row, col = divmod(dest, 8)
+
+        if orig in DROP_FAIRIES:
+            home = (6, 7) if self._color == "white" else (0, 1)
+
+            return (self.can_enter(DROP_FAIRIES[orig]) and row in home
+                    and self._board.get(row, col) is None)
+
+        piece = self._board.get(*divmod(orig, 8))
+
+        return (piece is not None and piece.get_color() == self._color
+                and self._board.is_valid_move(*divmod(orig, 8), row, col))
+
+    def get_capture(self, move: int) -> "ChessPiece | None":
+        """Returns the piece an encoded move would capture, if any."""
+        if move // 64 in DROP_FAIRIES:
+            return None
+
+        return self._board.get(*divmod(move % 64, 8))
+
+    def push(self, move: int) -> None:
+        """Plays an encoded move, which must be legal. Mirrors
+        ChessVar.make_move() and ChessVar.enter_fairy_piece() without output.
+        """
+        orig, dest = divmod(move, 64)
+        player = self._players[self._color]
+        captured = None
+        point = False
+
+        if orig in DROP_FAIRIES:
+            fairy = DROP_FAIRIES[orig]
+            self._board.set(*divmod(dest, 8), ChessPiece(fairy, self._color))
+            player.remove_from_reserve(fairy)
+        else:
+            piece = self._board.set(*divmod(orig, 8), None)
+            captured = self._board.set(*divmod(dest, 8), piece)
+
+        self._history.append((move, captured, self._winner, self._quiet_plies))
+        self._color = "black" if self._color == "white" else "white"
+        self._quiet_plies = 0 if captured is not None else self._quiet_plies + 1
+
+        if captured is not None:
+            if captured.get_type() == "king":
+                self._winner = player.get_color()
+            elif captured.get_type() in POINT_PIECES:
+                self._players[captured.get_color()].increment_fairy_points()
+                point = True
+
+        self._history[-1] += (point,)
+
+        key = self.get_hash()
+        self._positions[key] = self._positions.get(key, 0) + 1
+
+    def pop(self) -> int:
+        """Undoes the last move played with push() and returns it."""
+        key = self.get_hash()
+        self._positions[key] -= 1
+
+        if not self._positions[key]:
+            del self._positions[key]
+
+        move, captured, winner, quiet_plies, point = self._history.pop()
+        orig, dest = divmod(move, 64)
+        self._quiet_plies = quiet_plies
+
+        self._color = "black" if self._color == "white" else "white"
+        self._winner = winner
+        player = self._players[self._color]
+
+        if orig in DROP_FAIRIES:
+            self._board.set(*divmod(dest, 8), None)
+            player.add_to_reserve(DROP_FAIRIES[orig])
+        else:
+            piece = self._board.set(*divmod(dest, 8), captured)
+            self._board.set(*divmod(orig, 8), piece)
+
+        if point:
+            self._players[captured.get_color()].decrement_fairy_points()
+
+        return move
+
+
+# Position text letters for each piece type; white uppercase, black lowercase
+PIECE_LETTERS = {
+    "king": "k", "queen": "q", "rook": "r", "bishop": "b", "knight": "n",
+    "pawn": "p", "falcon": "f", "hunter": "h"
+}
+LETTER_PIECES = {letter: piece_type for piece_type, letter in PIECE_LETTERS.items()}
+
+START_TEXT = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w FHfh 0/0"
+
+
+def position_text(position: Position) -> str:
+    """Describes a position in one line, in the style of FEN: the board
+    from rank 8 to rank 1 (digits count empty squares), the side to move
+    ("w" or "b"), the fairy pieces in reserve ("-" if none), and the white
+    and black fairy points. The starting position is START_TEXT.
+    """
+    board = position.get_board()
+    ranks = []
+
+    for row in range(8):
+        rank = ""
+        empty = 0
+
+        for col in range(8):
+            piece = board.get(row, col)
+
+            if piece is None:
+                empty += 1
+                continue
+
+            letter = PIECE_LETTERS[piece.get_type()]
+            rank += (str(empty) if empty else "") + (
+                letter.upper() if piece.get_color() == "white" else letter)
+            empty = 0
+
+        ranks.append(rank + (str(empty) if empty else ""))
+
+    reserve = "".join(
+        fairy[0].upper() if color == "white" else fairy[0]
+        for color in ("white", "black")
+        for fairy in position.get_player(color).get_reserve()
+    )
+    points = "/".join(str(position.get_player(color).get_fairy_points())
+                      for color in ("white", "black"))
+
+    return " ".join(["/".join(ranks), position.get_color()[0], reserve or "-", points])
+
+
+def parse_position(text: str, repetition_limit: "int | None" = None,
+                   no_capture_limit: "int | None" = None,
+                   ply_limit: "int | None" = None) -> Position:
+    """Builds a Position from the text written by position_text(). Raises
+    ValueError if the text is malformed.
+    """
+    fields = text.split()
+
+    if len(fields) != 4 or fields[1] not in ("w", "b"):
+        raise ValueError(f"malformed position {text!r}")
+
+    ranks = fields[0].split("/")
+    points = fields[3].split("/")
+
+    if (len(ranks) != 8 or len(points) != 2 or not all(p.isdigit() for p in points)
+        or fields[2] != "-" and not set(fields[2]) <= set("FHfh")
+    ):
+        raise ValueError(f"malformed position {text!r}")
+
+    grid = []
+
+    for rank in ranks:
+        row = []
+
+        for letter in rank:
+            if letter.isdigit():
+                row.extend([None] * int(letter))
+            elif letter.lower() in LETTER_PIECES:
+                row.append(ChessPiece(LETTER_PIECES[letter.lower()],
+                                      "white" if letter.isupper() else "black"))
+            else:
+                raise ValueError(f"malformed position {text!r}")
+
+        if len(row) != 8:
+            raise ValueError(f"malformed position {text!r}")
+
+        grid.append(row)
+
+    position = Position(repetition_limit, no_capture_limit, ply_limit)
+    position._load(grid, "white" if fields[1] == "w" else "black",
+                   {"white": [f for f in ("falcon", "hunter") if f[0].upper() in fields[2]],
+                    "black": [f for f in ("falcon", "hunter") if f[0] in fields[2]]},
+                   {"white": int(points[0]), "black": int(points[1])})
+
+    return position
+
+
+def replay(moves: "list[str]") -> Position:
+    """Plays moves given in text notation from the starting position and
+    returns the resulting Position. Raises ValueError on a malformed or
+    illegal move.
+    """
+    position = Position()
+
+    for ply, text in enumerate(moves):
+        move = parse_move(text)
+
+        if move is None or not position.is_legal(move):
+            raise ValueError(f"illegal move {text!r} at ply {ply}")
+
+        position.push(move)
+
+    return position
+
+
+def self_play(depth: int = 2, movetime: "float | None" = None,
+              seed: "int | None" = None, repetition_limit: int = 3,
+              no_capture_limit: int = 100, ply_limit: int = 400
+              ) -> "tuple[str, list[str]]":
+    """Plays the engine against itself until a king is captured or a draw
+    rule applies, so every game has a bounded length. A seed varies the move
+    order at the root so repeated games differ. Returns (result, moves) in
+    the form written by format_record().
+    """
+    position = Position(repetition_limit, no_capture_limit, ply_limit)
+    searcher = Searcher()
+    moves = []
+    rng = random.Random(seed)
+
+    while position.get_game_state() == "UNFINISHED":
+        result = searcher.search(position, depth, movetime,
+                                 seed=None if seed is None else rng.getrandbits(32))
+
+        if result.move is None:
+            break
+
+        moves.append(format_move(result.move))
+        position.push(result.move)
+
+    return position.get_game_state(), moves
+
+
+def format_record(result: str, moves: "list[str]") -> str:
+    """Formats a game record line: the final game state followed by the
+    moves in text notation, separated by spaces.
+    """
+    return " ".join([result, *moves])
+
+
+def read_records(path: str):
+    """Streams game records from a file, one game per line as written by
+    format_record(). Yields (result, moves) pairs; blank lines and lines
+    starting with "#" are skipped.
+    """
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            fields = line.split()
+
+            if fields and not fields[0].startswith("#"):
+                yield fields[0], fields[1:]
+
+
+class EvalCache:
+    """Fixed-capacity cache of evaluation terms that depend only on the pawns
+    and the players' reserves and fairy points, which change far less often
+    than the rest of the position. Entries are indexed by key and a new entry
+    simply overwrites whatever shares its slot. Counts hits and misses.
+    """
+    def __init__(self, size: int = 1 << 14) -> None:
+        if size & (size - 1):
+            raise ValueError("cache size must be a power of two")
+
+        self._size = size
+        self._keys = [None] * size
+        self._values = [0] * size
+        self._hits = 0
+        self._misses = 0
+
+    def probe(self, key: int) -> "int | None":
+        """Returns the value cached for key, or None on a miss."""
+        index = key & (self._size - 1)
+
+        if self._keys[index] == key:
+            self._hits += 1
+            return self._values[index]
+
+        self._misses += 1
+        return None
+
+    def store(self, key: int, value: int) -> None:
+        """Caches a value for key, replacing the slot's previous entry."""
+        index = key & (self._size - 1)
+        self._keys[index] = key
+        self._values[index] = value
+
+    def get_hits(self) -> int:
+        """Returns the number of probes that found their key."""
+        return self._hits
+
+    def get_misses(self) -> int:
+        """Returns the number of probes that did not find their key."""
+        return self._misses
+
+    def get_hit_rate(self) -> float:
+        """Returns the fraction of probes that hit (0 before any probes)."""
+        probes = self._hits + self._misses
+
+        return self._hits / probes if probes else 0.0
+
+    def clear(self) -> None:
+        """Empties the cache and resets its counters."""
+        self._keys = [None] * self._size
+        self._hits = self._misses = 0
+
+
+def pawn_structure(board: Board) -> int:
+    """Returns the pawn structure terms of the evaluation in centipawns from
+    white's point of view: penalties for doubled and isolated pawns and a
+    bonus for passed pawns.
+    """
+    weights = WEIGHTS["pawn_structure"]
+    pawns = {"white": [[] for _ in range(8)], "black": [[] for _ in range(8)]}
+
+    for row in range(8):
+        for col in range(8):
+            piece = board.get(row, col)
+
+            if piece is not None and piece.get_type() == "pawn":
+                pawns[piece.get_color()][col].append(row)
+
+    score = 0
+
+    for color, sign in (("white", 1), ("black", -1)):
+        files = pawns[color]
+        enemy = pawns["black" if color == "white" else "white"]
+
+        for col, rows in enumerate(files):
+            if not rows:
+                continue
+
+            score += sign * weights["doubled"] * (len(rows) - 1)
+
+            if not any(files[c] for c in (col - 1, col + 1) if 0 <= c <= 7):
+                score += sign * weights["isolated"] * len(rows)
+
+            # Passed if no enemy pawn is ahead on this or an adjacent file
+            blockers = [r for rows_on_file in enemy[max(col - 1, 0):col + 2]
+                        for r in rows_on_file]
+
+            for row in rows:
+                if color == "white" and all(r >= row for r in blockers):
+                    score += sign * weights["passed"]
+                elif color == "black" and all(r <= row for r in blockers):
+                    score += sign * weights["passed"]
+
+    return score
+
+
+def structure_terms(position: Position, cache: "EvalCache | None" = None) -> int:
+    """Returns the pawn structure and fairy reserve terms of the evaluation
+    from white's point of view, using the cache when one is given. The key
+    combines the pawn hash with both players' reserve and point hashes.
+    """
+    white = position.get_player("white")
+    black = position.get_player("black")
+
+    if cache is not None:
+        key = position.get_board().get_pawn_hash() ^ white.get_hash() ^ black.get_hash()
+        value = cache.probe(key)
+
+        if value is not None:
+            return value
+
+    value = (pawn_structure(position.get_board())
+             + reserve_value(len(white.get_reserve()), white.get_fairy_points())
+             - reserve_value(len(black.get_reserve()), black.get_fairy_points()))
+
+    if cache is not None:
+        cache.store(key, value)
+
+    return value
+
+
+def evaluate(position: Position, cache: "EvalCache | None" = None) -> int:
+    """Returns a static evaluation of the position in centipawns from the
+    point of view of the side to move. Pawn structure and reserve terms are
+    memoized in cache if one is given.
+    """
+    material = WEIGHTS["material"]
+    tables = WEIGHTS["piece_square"]
+    board = position.get_board()
+    score = 0
+
+    for row in range(8):
+        for col in range(8):
+            piece = board.get(row, col)
+
+            if piece is None:
+                continue
+
+            piece_type = piece.get_type()
+
+            if piece.get_color() == "white":
+                score += material[piece_type] + tables[piece_type][row * 8 + col]
+            else:
+                score -= material[piece_type] + tables[piece_type][(7 - row) * 8 + col]
+
+    score += structure_terms(position, cache)
+
+    return score if position.get_color() == "white" else -score
+
+
+def reserve_value(reserve: int, points: int) -> int:
+    """Returns the evaluation of a player's fairy reserve given how many
+    fairy pieces remain in it and the player's fairy points.
+    """
+    ready = 1 if points >= 3 - reserve else 0
+
+    return reserve * WEIGHTS["reserve"][ready]
+
+
+# Value of a king in exchanges; high enough that losing it outweighs any gain
+KING_VALUE = 20000
+
+
+def see(position: Position, move: int) -> int:
+    """Static exchange evaluation: returns the net material the side to move
+    gains by playing a capture and then letting both sides recapture on that
+    square with their least valuable attacker for as long as it pays. Each
+    queen, rook, bishop, or knight lost hands its owner a fairy point, which
+    is valued as the change it makes to that player's reserve_value().
+
+    The exchange is played out on the board and undone, so the attack maps
+    reveal pieces that attack through the square's earlier occupants.
+    """
+    orig, dest = divmod(move, 64)
+    victim = position.get_capture(move)
+
+    if victim is None:
+        return 0
+
+    board = position.get_board()
+    material = WEIGHTS["material"]
+    row, col = divmod(dest, 8)
+    players = {color: position.get_player(color) for color in ("white", "black")}
+    points = {color: player.get_fairy_points() for color, player in players.items()}
+
+    def value(piece):
+        """Returns what capturing a piece is worth to the capturer."""
+        piece_type = piece.get_type()
+
+        if piece_type == "king":
+            return KING_VALUE
+
+        if piece_type not in POINT_PIECES:
+            return material[piece_type]
+
+        owner = piece.get_color()
+        reserve = len(players[owner].get_reserve())
+        earned = (reserve_value(reserve, points[owner] + 1)
+                  - reserve_value(reserve, points[owner]))
+        points[owner] += 1
+
+        return material[piece_type] - earned
+
+    gains = [value(victim)]
+    undo = [(*divmod(orig, 8), board.set(*divmod(orig, 8), None))]
+    undo.append((row, col, board.set(row, col, undo[0][2])))
+    side = "black" if position.get_color() == "white" else "white"
+
+    while victim.get_type() != "king":
+        attackers = board.attackers_of(row, col, side)
+
+        if not attackers:
+            break
+
+        r, c = min(attackers, key=lambda square: (
+            KING_VALUE if board.get(*square).get_type() == "king"
+            else material[board.get(*square).get_type()]
+        ))
+        victim = board.get(row, col)
+        gains.append(value(victim) - gains[-1])
+
+        undo.append((r, c, board.set(r, c, None)))
+        board.set(row, col, undo[-1][2])
+        side = "black" if side == "white" else "white"
+
+    for r, c, piece in reversed(undo):
+        board.set(r, c, piece)
+
+    # Either side may stop capturing when continuing would lose material
+    for index in range(len(gains) - 1, 0, -1):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+
+    return gains[0]
+
+
+# Transposition table bound types
+EXACT, LOWER, UPPER = 1, 2, 3
+
+
+class TranspositionTable:
+    """Fixed-size cache of search results indexed by position hash. Each slot
+    is two 64-bit words: the key XORed with the data, and the data itself
+    (move, depth, bound type, and score packed together). A reader accepts a
+    slot only if the words agree, so a slot torn by a concurrent writer is
+    simply treated as a miss and no locking is needed.
+    """
+    def __init__(self, size: int = 1 << 16, buffer=None) -> None:
+        if size & (size - 1):
+            raise ValueError("table size must be a power of two")
+
+        self._size = size
+        self._buffer = buffer if buffer is not None else bytearray(size * 16)
+        self._slots = memoryview(self._buffer).cast("Q")
+
+    def get_size(self) -> int:
+        """Returns the number of slots in the table."""
+        return self._size
+
+    def clear(self) -> None:
+        """Empties every slot in the table."""
+        self._slots[:] = memoryview(bytes(self._size * 16)).cast("Q")
+
+    def probe(self, key: int) -> "tuple[int, int, int, int] | None":
+        """Returns the (move, depth, bound, score) stored for a position hash,
+        or None if there is no entry for it.
+        """
+        index = (key & (self._size - 1)) * 2
+        data = self._slots[index + 1]
+
+        if data == 0 or self._slots[index] ^ data != key:
+            return None
+
+        return (data & 0x1FFF, (data >> 13) & 0xFF, (data >> 21) & 0x3,
+                ((data >> 23) & 0xFFFFFFFF) - 0x80000000)
+
+    def store(self, key: int, move: "int | None", depth: int, bound: int,
+              score: int) -> None:
+        """Stores a search result for a position hash, replacing any entry
+        for another position or from a search no deeper than this one.
+        """
+        index = (key & (self._size - 1)) * 2
+        old = self._slots[index + 1]
+
+        if old and self._slots[index] ^ old == key and (old >> 13) & 0xFF > depth:
+            return
+
+        data = ((MOVE_COUNT if move is None else move) | min(depth, 255) << 13
+                | bound << 21 | (score + 0x80000000) << 23)
+        self._slots[index] = key ^ data
+        self._slots[index + 1] = data
+
+    def release(self) -> None:
+        """Releases the table's view of its buffer."""
+        self._slots.release()
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Transposition table kept in a named shared memory block. The process
+    that creates it owns the block and must unlink() it; other processes
+    attach by name.
+    """
+    def __init__(self, size: int = 1 << 16, name: "str | None" = None) -> None:
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size * 16)
+            self._shm.buf[:] = bytes(size * 16)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        super().__init__(size, self._shm.buf)
+
+    def get_name(self) -> str:
+        """Returns the name other processes use to attach to the table."""
+        return self._shm.name
+
+    def release(self) -> None:
+        """Detaches this process from the shared memory block."""
+        super().release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Detaches and destroys the shared memory block."""
+        self.release()
+        self._shm.unlink()
+
+
+class SearchResult(NamedTuple):
+    """Outcome of a search: best move, its score for the side to move, the
+    completed depth, nodes visited, and the principal variation.
+    """
+    move: "int | None"
+    score: int
+    depth: int
+    nodes: int
+    pv: "list[int]"
+
+
+class SearchAborted(Exception):
+    """Raised inside a search when its time runs out or it is stopped."""
+
+
+class Searcher:
+    """Iterative deepening alpha-beta (negamax) search with a transposition
+    table. A king capture ends the game, so scores near MATE mean a king can
+    be captured by force.
+
+    An evaluator (such as ChessNNUE.NNUEEvaluator: anything with attach(),
+    detach(), get_position(), and evaluate(position)) replaces evaluate()
+    when given. It is attached to the searched position for each search.
+    """
+    def __init__(self, table: "TranspositionTable | None" = None,
+                 eval_cache: "EvalCache | None" = None, evaluator=None) -> None:
+        self._table = table if table is not None else TranspositionTable()
+        self._eval_cache = eval_cache if eval_cache is not None else EvalCache()
+        self._evaluator = evaluator
+        self._nodes = 0
+        self._node_limit = None
+        self._deadline = None
+        self._stop = None
+        self._rng = None
+
+    def get_table(self) -> TranspositionTable:
+        """Returns the searcher's transposition table."""
+        return self._table
+
+    def get_eval_cache(self) -> EvalCache:
+        """Returns the searcher's cache of pawn structure and reserve terms."""
+        return self._eval_cache
+
+    def get_evaluator(self):
+        """Returns the searcher's evaluator, or None if it uses evaluate()."""
+        return self._evaluator
+
+    def search(self, position: Position, depth: int = 64,
+               movetime: "float | None" = None, stop=None, seed: "int | None" = None,
+               on_iteration=None, nodes: "int | None" = None) -> SearchResult:
+        """Searches the position to the given depth or until movetime seconds
+        pass, the node budget is spent, or the stop event (anything with
+        is_set()) is set, whichever comes first. A seed shuffles root move
+        order, so parallel searchers explore different lines. on_iteration,
+        if given, is called with the SearchResult of each completed depth.
+        Returns the deepest result.
+        """
+        self._nodes = 0
+        self._node_limit = nodes
+        self._deadline = None if movetime is None else time.perf_counter() + movetime
+        self._stop = stop
+        self._rng = None if seed is None else random.Random(seed)
+
+        moves = position.legal_moves()
+        result = SearchResult(moves[0] if moves else None, 0, 0, 0, [])
+        attached = (self._evaluator is not None
+                    and self._evaluator.get_position() is not position)
+
+        if attached:
+            self._evaluator.attach(position)
+
+        try:
+            for current in range(1, depth + 1):
+                try:
+                    score = self._negamax(position, current, -INFINITY, INFINITY, 0)
+                except SearchAborted:
+                    break
+
+                pv = self._principal_variation(position, current)
+                result = SearchResult(pv[0] if pv else result.move, score, current,
+                                      self._nodes, pv)
+
+                if on_iteration is not None:
+                    on_iteration(result)
+
+                if abs(score) >= MATE - 64:
+                    break
+        finally:
+            if attached:
+                self._evaluator.detach()
+
+        return result._replace(nodes=self._nodes)
+
+    def _check_limits(self) -> None:
+        """Raises SearchAborted if the search has been stopped, timed out, or
+        spent its node budget.
+        """
+        if (self._stop is not None and self._stop.is_set()
+            or self._node_limit is not None and self._nodes >= self._node_limit
+            or self._deadline is not None and time.perf_counter() >= self._deadline
+        ):
+            raise SearchAborted
+
+    def _order_moves(self, position: Position, moves: "list[int]",
+                     tt_move: "int | None", ply: int) -> "list[int]":
+        """Orders moves for search: the table move first, then captures by
+        most valuable victim/least valuable attacker, then quiet moves.
+        """
+        material = WEIGHTS["material"]
+        board = position.get_board()
+
+        if ply == 0 and self._rng is not None:
+            self._rng.shuffle(moves)
+
+        def key(move):
+            if move == tt_move:
+                return -INFINITY
+
+            captured = position.get_capture(move)
+
+            if captured is None:
+                return 0
+
+            if captured.get_type() == "king":
+                return -MATE
+
+            attacker = board.get(*divmod(move // 64, 8))
+
+            return -(material[captured.get_type()] * 16
+                     - material[attacker.get_type()] // 16)
+
+        moves.sort(key=key)
+
+        return moves
+
+    def _negamax(self, position: Position, depth: int, alpha: int, beta: int,
+                 ply: int) -> int:
+        """Returns the negamax score of the position searched to depth."""
+        self._nodes += 1
+
+        if self._nodes & 1023 == 0 or self._nodes == self._node_limit:
+            self._check_limits()
+
+        if position.get_winner() is not None:
+            return -MATE + ply
+
+        # Repeating a position can be forced to a draw; treat it as one
+        if ply > 0 and (position.is_repetition() or position.get_draw() is not None):
+            return 0
+
+        if depth <= 0:
+            return self._quiesce(position, alpha, beta, ply)
+
+        key = position.get_hash()
+        entry = self._table.probe(key)
+        tt_move = None
+
+        if entry is not None:
+            move, entry_depth, bound, score = entry
+            tt_move = move if move < MOVE_COUNT else None
+            score = _score_from_table(score, ply)
+
+            if ply > 0 and entry_depth >= depth:
+                if (bound == EXACT or bound == LOWER and score >= beta
+                    or bound == UPPER and score <= alpha
+                ):
+                    return score
+
+        moves = position.legal_moves()
+
+        if not moves:
+            return 0
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+
+        for move in self._order_moves(position, moves, tt_move, ply):
+            position.push(move)
+            try:
+                score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                position.pop()
+
+            if score > best_score:
+                best_score, best_move = score, move
+
+            if score > alpha:
+                alpha = score
+
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+
+        self._table.store(key, best_move, depth, bound,
+                          _score_to_table(best_score, ply))
+
+        return best_score
+
+    def _quiesce(self, position: Position, alpha: int, beta: int, ply: int) -> int:
+        """Returns the score of the position once pending captures are
+        resolved. Only captures are searched, and captures that static
+        exchange evaluation shows losing material are skipped; the side to
+        move may also decline to capture and keep the static evaluation.
+        """
+        self._nodes += 1
+
+        if self._nodes & 1023 == 0 or self._nodes == self._node_limit:
+            self._check_limits()
+
+        if position.get_winner() is not None:
+            return -MATE + ply
+
+        if self._evaluator is not None:
+            best_score = self._evaluator.evaluate(position)
+        else:
+            best_score = evaluate(position, self._eval_cache)
+
+        if best_score >= beta:
+            return best_score
+
+        alpha = max(alpha, best_score)
+        captures = self._order_moves(position, position.capture_moves(), None, ply)
+
+        for move in captures:
+            if position.get_capture(move).get_type() == "king":
+                return MATE - ply - 1
+
+            if see(position, move) < 0:
+                continue
+
+            position.push(move)
+            try:
+                score = -self._quiesce(position, -beta, -alpha, ply + 1)
+            finally:
+                position.pop()
+
+            if score > best_score:
+                best_score = score
+
+            if score > alpha:
+                alpha = score
+
+            if alpha >= beta:
+                break
+
+        return best_score
+
+    def _principal_variation(self, position: Position, depth: int) -> "list[int]":
+        """Follows table moves from the position to recover the best line."""
+        pv = []
+
+        for _ in range(depth):
+            entry = self._table.probe(position.get_hash())
+
+            if entry is None or not position.is_legal(entry[0]):
+                break
+
+            pv.append(entry[0])
+            position.push(entry[0])
+
+        for _ in pv:
+            position.pop()
+
+        return pv
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    """Makes king-capture scores relative to the node before storing them."""
+    if score >= MATE - 512:
+        return score + ply
+    if score <= -MATE + 512:
+        return score - ply
+
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    """Makes stored king-capture scores relative to the root again."""
+    if score >= MATE - 512:
+        return score - ply
+    if score <= -MATE + 512:
+        return score + ply
+
+    return score
+
+
+class Ponderer:
+    """Searches ahead on the opponent's time. After the engine moves, start()
+    searches the position that follows the reply the engine expects, in a
+    background thread. When the real reply arrives, resolve() either keeps
+    that search (it was the expected move) or cancels it.
+    """
+    def __init__(self, searcher: "Searcher | None" = None) -> None:
+        self._searcher = searcher if searcher is not None else Searcher()
+        self._thread = None
+        self._stop = threading.Event()
+        self._move = None
+        self._result = None
+        self._started = None
+
+    def get_searcher(self) -> "Searcher":
+        """Returns the searcher shared by pondering and regular searches."""
+        return self._searcher
+
+    def is_pondering(self) -> bool:
+        """Returns whether a background search is running or unresolved."""
+        return self._thread is not None
+
+    def get_move(self) -> "int | None":
+        """Returns the reply being pondered, if any."""
+        return self._move
+
+    def start(self, position: Position, move: int, depth: int = 64) -> None:
+        """Starts searching, in the background, the position after the
+        expected reply move. The position itself is left untouched.
+        """
+        self.stop()
+
+        pondered = copy.deepcopy(position)
+        pondered.push(move)
+
+        self._move = move
+        self._result = None
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(pondered, depth),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, position: Position, depth: int) -> None:
+        """Background thread body: searches until stopped."""
+        self._result = self._searcher.search(position, depth, stop=self._stop)
+
+    def stop(self) -> None:
+        """Cancels any background search and waits for it to finish."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+
+        self._thread = None
+        self._move = None
+
+    def resolve(self, move: "int | None", movetime: float) -> "SearchResult | None":
+        """Takes the reply actually played. If it is the pondered move, lets
+        the background search run until movetime seconds have passed since
+        pondering started and returns its result, so the time spent pondering
+        counts toward the move and a long ponder answers at once. Otherwise
+        cancels the search and returns None; the shared transposition table
+        still helps the fresh search that follows.
+        """
+        if self._thread is None or move != self._move:
+            self.stop()
+            return None
+
+        pondered = time.perf_counter() - self._started
+        self._thread.join(max(0.0, movetime - pondered))
+        self.stop()
+
+        return self._result
+
+
+def _parallel_worker(position: Position, table_name: str, table_size: int,
+                     depth: int, movetime: "float | None", stop, results,
+                     seed: int) -> None:
+    """Entry point for a parallel_search() helper process. Searches with a
+    shuffled root order and reports each completed depth to the results
+    queue as (seed, result), followed by (seed, None) when finished, even
+    if the search or attaching to the shared table fails.
+    """
+    table = None
+
+    try:
+        table = SharedTranspositionTable(table_size, table_name)
+        Searcher(table).search(position, depth, movetime, stop, seed,
+                               lambda result: results.put((seed, result)))
+    finally:
+        results.put((seed, None))
+
+        if table is not None:
+            table.release()
+
+
+def parallel_search(position: Position, workers: int = 2, depth: int = 64,
+                    movetime: "float | None" = None,
+                    table_size: int = 1 << 18) -> SearchResult:
+    """Searches the position with the calling process plus workers - 1 helper
+    processes that share one transposition table in shared memory. Helpers
+    search the same root with different move orders and odd helpers one ply
+    deeper, filling the table for each other. When the main search finishes,
+    the helpers are stopped and the deepest completed result is returned; a
+    helper that crashes or is killed is simply left out.
+    """
+    table = SharedTranspositionTable(table_size)
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    helpers = [
+        multiprocessing.Process(
+            target=_parallel_worker,
+            args=(position, table.get_name(), table_size, depth + index % 2,
+                  movetime, stop, results, index),
+            daemon=True
+        )
+        for index in range(1, workers)
+    ]
+
+    try:
+        for helper in helpers:
+            helper.start()
+
+        best = Searcher(table).search(position, depth, movetime, stop)
+        stop.set()
+
+        finished = set()
+        nodes = {0: best.nodes}
+
+        while len(finished) < len(helpers):
+            try:
+                seed, result = results.get(timeout=0.1)
+            except queue.Empty:
+                # A helper that died without reporting counts as finished
+                finished.update(index for index, helper in enumerate(helpers, 1)
+                                if helper.exitcode is not None)
+                continue
+
+            if result is None:
+                finished.add(seed)
+                continue
+
+            nodes[seed] = result.nodes
+
+            if result.depth > best.depth and result.move is not None:
+                best = result
+
+        for helper in helpers:
+            helper.join()
+    finally:
+        stop.set()
+        table.unlink()
+
+    return best._replace(nodes=sum(nodes.values()))
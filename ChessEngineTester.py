@@ -0,0 +1,373 @@
+import os
+import random
+import time
+import unittest
+from unittest import mock
+import ChessEngine
+from ChessVar import ChessPiece
+from ChessEngine import (Position, Searcher, TranspositionTable,
+                         SharedTranspositionTable, parallel_search, parse_move,
+                         format_move, self_play, see, reserve_value, Ponderer,
+                         position_text, parse_position, replay, START_TEXT,
+                         EvalCache, evaluate, pawn_structure, structure_terms,
+                         WEIGHTS, EXACT, LOWER, MATE)
+
+
+def play(position, *moves):
+    """Pushes moves given in text notation onto a position."""
+    for text in moves:
+        move = parse_move(text)
+        assert position.is_legal(move), text
+        position.push(move)
+
+
+class TestPosition(unittest.TestCase):
+    """Tests the print-free Position used by the engine."""
+    def test_notation(self):
+        """Tests move text round trips."""
+        for text in ("e2e4", "a7a8", "F@e2", "H@h8"):
+            self.assertEqual(format_move(parse_move(text)), text)
+
+        self.assertIsNone(parse_move("e2e9"))
+        self.assertIsNone(parse_move("Q@e2"))
+        self.assertIsNone(parse_move("e2"))
+
+    def test_position_text(self):
+        """Tests position text round trips."""
+        self.assertEqual(position_text(Position()), START_TEXT)
+
+        position = replay(["e2e4", "d7d5", "d1g4", "c8g4", "F@d1"])
+        text = position_text(position)
+        self.assertEqual(text, "rn1qkbnr/ppp1pppp/8/3p4/4P1b1/8/PPPP1PPP/RNBFKBNR b Hfh 1/0")
+        self.assertEqual(parse_position(text).get_hash(), position.get_hash())
+
+        for text in ("8/8/8 w - 0/0", START_TEXT.replace(" w ", " x "),
+                     START_TEXT.replace("FHfh", "Q"), "9/8/8/8/8/8/8/8 w - 0/0"):
+            with self.assertRaises(ValueError):
+                parse_position(text)
+
+    def test_push_pop(self):
+        """Tests that pop() restores the board, players, and hash."""
+        position = Position()
+        start = position.get_hash()
+
+        self.assertEqual(len(position.legal_moves()), 20)
+
+        play(position, "e2e4", "d7d5", "d1g4", "c8g4")
+        self.assertEqual(position.get_player("white").get_fairy_points(), 1)
+        self.assertIn(parse_move("F@d1"), position.legal_moves())
+
+        play(position, "F@d1")
+        self.assertEqual(position.get_player("white").get_reserve(), ["hunter"])
+        self.assertNotIn(parse_move("H@e1"), position.legal_moves())
+
+        for _ in range(5):
+            position.pop()
+
+        self.assertEqual(position.get_hash(), start)
+        self.assertEqual(position.get_color(), "white")
+        self.assertEqual(position.get_player("white").get_fairy_points(), 0)
+        self.assertEqual(position.get_player("white").get_reserve(), ["falcon", "hunter"])
+
+    def test_king_capture(self):
+        """Tests that capturing a king ends the game."""
+        position = Position()
+        play(position, "e2e4", "e7e5", "e1e2", "e8e7", "e2f3", "e7e8",
+             "f3f4", "e5f4")
+
+        self.assertEqual(position.get_winner(), "black")
+        self.assertEqual(position.legal_moves(), [])
+
+        position.pop()
+        self.assertIsNone(position.get_winner())
+
+    def test_draw_rules(self):
+        """Tests repetition tracking and draw rules survive push/pop."""
+        position = Position(repetition_limit=3)
+        shuffle = ("g1f3", "g8f6", "f3g1", "f6g8")
+
+        play(position, *shuffle)
+        self.assertTrue(position.is_repetition())
+        self.assertIsNone(position.get_draw())
+
+        play(position, *shuffle)
+        self.assertEqual(position.get_game_state(), "DRAW")
+        self.assertEqual(position.legal_moves(), [])
+
+        position.pop()
+        self.assertEqual(position.get_game_state(), "UNFINISHED")
+
+        position = Position(no_capture_limit=3)
+        play(position, "e2e4", "d7d5", "e4d5", "d8d5", "a2a3", "b7b6")
+        self.assertIsNone(position.get_draw())
+        play(position, "c2c3")
+        self.assertEqual(position.get_draw(), "move limit")
+
+    def test_capture_moves(self):
+        """Tests attack-map captures match captures among legal moves."""
+        rng = random.Random(32)
+
+        for _ in range(3):
+            position = Position()
+
+            while position.get_winner() is None and position.get_ply() < 120:
+                captures = [move for move in position.legal_moves()
+                            if position.get_capture(move) is not None]
+                self.assertEqual(sorted(position.capture_moves()), sorted(captures))
+                position.push(rng.choice(position.legal_moves()))
+
+
+def empty_position():
+    """Returns a Position with every piece removed from the board."""
+    position = Position()
+    board = position.get_board()
+
+    for row in range(8):
+        for col in range(8):
+            board.set(row, col, None)
+
+    return position
+
+
+def place(position, *pieces):
+    """Places (type, color, square) pieces on a position's board."""
+    for piece_type, color, square in pieces:
+        row, col = 8 - int(square[1]), ord(square[0]) - 97
+        position.get_board().set(row, col, ChessPiece(piece_type, color))
+
+
+class TestStaticExchange(unittest.TestCase):
+    """Tests static exchange evaluation."""
+    def test_undefended_capture(self):
+        """Tests winning an undefended pawn."""
+        position = empty_position()
+        place(position, ("rook", "white", "a1"), ("pawn", "black", "a7"))
+
+        self.assertEqual(see(position, parse_move("a1a7")),
+                         WEIGHTS["material"]["pawn"])
+
+    def test_defended_capture(self):
+        """Tests losing a queen for a pawn, including the point it earns."""
+        position = empty_position()
+        place(position, ("queen", "white", "d4"), ("pawn", "black", "d5"),
+              ("pawn", "black", "e6"))
+        start = position.get_hash()
+
+        point = reserve_value(2, 1) - reserve_value(2, 0)
+        self.assertEqual(see(position, parse_move("d4d5")),
+                         WEIGHTS["material"]["pawn"]
+                         - WEIGHTS["material"]["queen"] + point)
+
+        # The board is left as it was
+        self.assertEqual(position.get_hash(), start)
+
+    def test_xray(self):
+        """Tests attackers revealed behind earlier capturers."""
+        position = empty_position()
+        place(position, ("rook", "white", "a1"), ("rook", "white", "a2"),
+              ("knight", "black", "a6"), ("rook", "black", "a8"))
+
+        # Rxa6 Rxa6 Rxa6: white wins a knight and a rook for a rook
+        material = WEIGHTS["material"]
+        self.assertGreater(see(position, parse_move("a2a6")),
+                           material["knight"] - material["rook"])
+
+    def test_king_recapture(self):
+        """Tests that a king may not recapture onto a defended square."""
+        position = empty_position()
+        place(position, ("knight", "white", "f7"), ("king", "black", "e8"),
+              ("bishop", "white", "c4"), ("king", "white", "h1"))
+        position.push(parse_move("h1h2"))
+
+        # The black king taking the knight is answered by a king capture
+        self.assertLess(see(position, parse_move("e8f7")), 0)
+
+
+class TestEvaluation(unittest.TestCase):
+    """Tests evaluation terms and their cache."""
+    def test_pawn_structure(self):
+        """Tests doubled, isolated, and passed pawn terms."""
+        weights = WEIGHTS["pawn_structure"]
+        position = empty_position()
+        place(position, ("pawn", "white", "a2"), ("pawn", "white", "a3"),
+              ("pawn", "black", "h7"), ("pawn", "black", "g6"),
+              ("pawn", "white", "g4"))
+
+        # White: doubled a-pawns, all three pawns isolated, and only the
+        # a-pawns passed. Black: g6 and h7 support each other, and g4 stands
+        # in front of both.
+        white = weights["doubled"] + 3 * weights["isolated"] + 2 * weights["passed"]
+        self.assertEqual(pawn_structure(position.get_board()), white)
+        self.assertEqual(pawn_structure(Position().get_board()), 0)
+
+    def test_cache(self):
+        """Tests cached terms match uncached terms and hits are counted."""
+        rng = random.Random(36)
+        cache = EvalCache(64)
+
+        for _ in range(3):
+            position = Position()
+
+            while position.get_winner() is None and position.get_ply() < 80:
+                self.assertEqual(structure_terms(position, cache),
+                                 structure_terms(position))
+                self.assertEqual(evaluate(position, cache), evaluate(position))
+                position.push(rng.choice(position.legal_moves()))
+
+        self.assertGreater(cache.get_hits(), 0)
+        self.assertGreater(cache.get_misses(), 0)
+        self.assertGreater(cache.get_hit_rate(), 0.3)
+
+        cache.clear()
+        self.assertEqual(cache.get_hit_rate(), 0.0)
+
+
+class TestSearch(unittest.TestCase):
+    """Tests the alpha-beta search and transposition tables."""
+    def test_table(self):
+        """Tests storing and probing table entries."""
+        table = TranspositionTable(1024)
+        table.store(123456789, 300, 4, EXACT, -250)
+
+        self.assertEqual(table.probe(123456789), (300, 4, EXACT, -250))
+        self.assertIsNone(table.probe(123456789 + 1024))
+
+        # A shallower result does not replace a deeper one
+        table.store(123456789, 301, 2, LOWER, 100)
+        self.assertEqual(table.probe(123456789), (300, 4, EXACT, -250))
+
+        table.clear()
+        self.assertIsNone(table.probe(123456789))
+
+    def test_shared_table(self):
+        """Tests that attached tables see the same entries."""
+        table = SharedTranspositionTable(1024)
+        other = SharedTranspositionTable(1024, table.get_name())
+
+        try:
+            table.store(987654321, 42, 3, EXACT, 17)
+            self.assertEqual(other.probe(987654321), (42, 3, EXACT, 17))
+        finally:
+            other.release()
+            table.unlink()
+
+    def test_finds_king_capture(self):
+        """Tests that the search captures a hanging king by force."""
+        position = Position()
+        play(position, "e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "g8f6")
+
+        result = Searcher().search(position, depth=3)
+
+        self.assertEqual(format_move(result.move), "h5f7")
+        self.assertGreater(result.score, MATE - 10)
+        self.assertEqual(result.pv[0], result.move)
+
+    def test_node_budget(self):
+        """Tests that a node budget stops the search."""
+        result = Searcher().search(Position(), nodes=500)
+
+        self.assertLessEqual(result.nodes, 500)
+        self.assertTrue(Position().is_legal(result.move))
+
+    def test_quiescence(self):
+        """Tests that the search sees a recapture beyond its horizon."""
+        position = empty_position()
+        place(position, ("king", "white", "h1"), ("queen", "white", "d1"),
+              ("king", "black", "h8"), ("pawn", "black", "d5"),
+              ("pawn", "black", "e6"))
+
+        result = Searcher().search(position, depth=1)
+
+        self.assertNotEqual(format_move(result.move), "d1d5")
+
+    def test_parallel_search(self):
+        """Tests that a parallel search returns a legal move."""
+        position = Position()
+        play(position, "e2e4", "e7e5")
+
+        result = parallel_search(position, workers=2, depth=2)
+
+        self.assertTrue(position.is_legal(result.move))
+        self.assertGreaterEqual(result.depth, 2)
+
+    def test_parallel_search_survives_failed_attach(self):
+        """Tests that a helper failing to open the shared table still lets
+        the search finish.
+        """
+        class FailingTable(SharedTranspositionTable):
+            def __init__(self, size=1 << 16, name=None):
+                if name is not None:
+                    raise OSError("cannot attach")
+                super().__init__(size, name)
+
+        with mock.patch.object(ChessEngine, "SharedTranspositionTable", FailingTable):
+            result = parallel_search(Position(), workers=2, depth=2)
+
+        self.assertTrue(Position().is_legal(result.move))
+
+    def test_parallel_search_survives_dead_helper(self):
+        """Tests that a helper dying without reporting counts as finished."""
+        with mock.patch.object(ChessEngine, "_parallel_worker",
+                               lambda *args: os._exit(1)):
+            result = parallel_search(Position(), workers=3, depth=2)
+
+        self.assertTrue(Position().is_legal(result.move))
+        self.assertEqual(result.depth, 2)
+
+    def test_ponder_hit(self):
+        """Tests that pondering the played reply returns its search."""
+        position = Position()
+        play(position, "e2e4")
+        ponderer = Ponderer()
+
+        ponderer.start(position, parse_move("e7e5"), depth=2)
+        self.assertTrue(ponderer.is_pondering())
+        self.assertEqual(position.get_ply(), 1)
+
+        result = ponderer.resolve(parse_move("e7e5"), 5.0)
+        self.assertFalse(ponderer.is_pondering())
+
+        play(position, "e7e5")
+        self.assertTrue(position.is_legal(result.move))
+        self.assertEqual(result.depth, 2)
+
+    def test_ponder_hit_counts_pondering_time(self):
+        """Tests that a hit after a long ponder returns well within movetime."""
+        position = Position()
+        play(position, "e2e4")
+        ponderer = Ponderer()
+
+        ponderer.start(position, parse_move("e7e5"))
+        time.sleep(1.0)
+
+        started = time.perf_counter()
+        result = ponderer.resolve(parse_move("e7e5"), 1.0)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.3)
+        play(position, "e7e5")
+        self.assertTrue(position.is_legal(result.move))
+        self.assertGreaterEqual(result.depth, 1)
+
+    def test_ponder_miss(self):
+        """Tests that a different reply cancels the background search."""
+        position = Position()
+        play(position, "e2e4")
+        ponderer = Ponderer()
+
+        ponderer.start(position, parse_move("e7e5"))
+        self.assertIsNone(ponderer.resolve(parse_move("d7d5"), 5.0))
+        self.assertFalse(ponderer.is_pondering())
+
+    def test_self_play_is_bounded(self):
+        """Tests that self-play stops at the ply limit."""
+        result, moves = self_play(depth=1, seed=1, ply_limit=12)
+
+        self.assertLessEqual(len(moves), 12)
+        self.assertIn(result, ("WHITE_WON", "BLACK_WON", "DRAW"))
+        if result == "DRAW":
+            self.assertEqual(len(moves), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
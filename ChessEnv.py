@@ -0,0 +1,298 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Gym-style vectorized environment for training agents on
+#                   Falcon-Hunter chess. VectorChessEnv steps N games at once
+#                   over print-free Positions and exposes preallocated NumPy
+#                   observation planes and legal-action masks that are updated
+#                   in place. Moves are played game by game on the Positions,
+#                   touching only the squares each move changes; the masks of
+#                   the whole batch are then derived at once from the piece
+#                   planes with NumPy move tables.
+
+import numpy as np
+
+from ChessVar import ChessPiece
+from ChessEngine import DROP_FAIRIES, DROP_ORIGINS, MOVE_COUNT, PIECE_TYPES, Position
+
+
+COLORS = ("white", "black")
+
+# Observation planes: one per piece type and color (white first), one per
+# fairy piece and color held in reserve, one per color holding its fairy
+# points, and one set to 1 when black is to move
+PIECE_PLANES = {
+    (color, piece_type): index * len(PIECE_TYPES) + offset
+    for index, color in enumerate(COLORS)
+    for offset, piece_type in enumerate(PIECE_TYPES)
+}
+RESERVE_PLANES = {
+    ("white", "falcon"): 16, ("white", "hunter"): 17,
+    ("black", "falcon"): 18, ("black", "hunter"): 19
+}
+POINT_PLANES = {"white": 20, "black": 21}
+TURN_PLANE = 22
+PIECE_PLANE_COUNT = 16
+PLANE_COUNT = 23
+
+
+def _move_tables() -> "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]":
+    """Builds the move tables used to derive action masks. The first three
+    are indexed by piece plane (PIECE_PLANE_COUNT for an empty square),
+    origin, and destination square: destinations a piece reaches on an empty
+    board whether or not the square is occupied, pawn pushes (destination
+    must be empty), and pawn captures (destination must hold an enemy). The
+    fourth maps each origin * 64 + destination to the squares strictly
+    between them on a line.
+    """
+    shape = (PIECE_PLANE_COUNT + 1, 64, 64)
+    moves = np.zeros(shape, dtype=bool)
+    pushes = np.zeros(shape, dtype=bool)
+    captures = np.zeros(shape, dtype=bool)
+    between = np.zeros((64 * 64, 64), dtype=np.float32)
+
+    for (color, piece_type), plane in PIECE_PLANES.items():
+        piece = ChessPiece(piece_type, color)
+        moveset = piece.get_moveset()
+
+        for row in range(8):
+            for col in range(8):
+                orig = row * 8 + col
+
+                if piece_type == "pawn":
+                    # Two steps only from a home row, as Board.is_valid_move()
+                    dy = moveset[0][0]
+                    steps = (1, 2) if row in (1, 6) else (1,)
+                    targets = [(pushes, row + dy * step, col) for step in steps]
+                    targets += [(captures, row + dy, col + dx) for _, dx in moveset[1:]]
+                else:
+                    limit = piece.get_step_limit() or 7
+                    targets = [(moves, row + dy * step, col + dx * step)
+                               for dy, dx in moveset for step in range(1, limit + 1)]
+
+                for table, r, c in targets:
+                    if 0 <= r <= 7 and 0 <= c <= 7:
+                        table[plane, orig, r * 8 + c] = True
+
+    for orig in range(64):
+        row, col = divmod(orig, 8)
+
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                r, c, path = row + dy, col + dx, []
+
+                while (dy or dx) and 0 <= r <= 7 and 0 <= c <= 7:
+                    between[orig * 64 + r * 8 + c, path] = 1
+                    path.append(r * 8 + c)
+                    r, c = r + dy, c + dx
+
+    return moves, pushes, captures, between
+
+
+MOVE_TABLE, PUSH_TABLE, CAPTURE_TABLE, BETWEEN_TABLE = _move_tables()
+
+# Squares of the home rows where each color may enter fairy pieces
+HOME_SQUARES = {"white": np.arange(64) >= 48, "black": np.arange(64) < 16}
+
+
+class VectorChessEnv:
+    """Runs count games in lockstep. Actions are encoded moves (see
+    ChessEngine.format_move()), so the action space has MOVE_COUNT entries
+    covering every origin/destination pair and both fairy entries.
+
+    get_observations() and get_action_masks() return the environment's own
+    arrays, which every step() and reset() overwrite in place; copy them to
+    keep a snapshot. A game that ends is reset automatically within step().
+    Draw rules bound every episode (see ChessEngine.Position).
+
+    The action masks of the whole batch are derived together from the
+    observation planes, so no game runs move generation. Playing the
+    actions is still a Python loop of Position.push() calls, whose attack
+    map updates dominate a step; throughput grows with the batch size only
+    until that loop does, at a few games.
+    """
+    def __init__(self, count: int, repetition_limit: "int | None" = 3,
+                 no_capture_limit: "int | None" = 100,
+                 ply_limit: "int | None" = 400) -> None:
+        self._count = count
+        self._rules = (repetition_limit, no_capture_limit, ply_limit)
+        self._positions = [None] * count
+        self._observations = np.zeros((count, PLANE_COUNT, 8, 8), dtype=np.float32)
+        self._masks = np.zeros((count, MOVE_COUNT), dtype=bool)
+        self._rewards = np.zeros(count, dtype=np.float32)
+        self._terminated = np.zeros(count, dtype=bool)
+        self._truncated = np.zeros(count, dtype=bool)
+
+    def get_count(self) -> int:
+        """Returns the number of games in the batch."""
+        return self._count
+
+    def get_observations(self) -> np.ndarray:
+        """Returns the (count, PLANE_COUNT, 8, 8) observation array."""
+        return self._observations
+
+    def get_action_masks(self) -> np.ndarray:
+        """Returns the (count, MOVE_COUNT) array of legal-action flags."""
+        return self._masks
+
+    def get_position(self, index: int) -> Position:
+        """Returns the Position of one game in the batch."""
+        return self._positions[index]
+
+    def reset(self) -> "tuple[np.ndarray, np.ndarray]":
+        """Starts every game over and returns (observations, action_masks)."""
+        for index in range(self._count):
+            self._reset_game(index)
+
+        self._update_masks()
+
+        return self._observations, self._masks
+
+    def step(self, actions) -> tuple:
+        """Plays one action in every game and returns (observations, rewards,
+        terminated, truncated, infos). Rewards are from the point of view of
+        the player who moved: 1 for capturing the enemy king, otherwise 0.
+        A game ends terminated on king capture, repetition, or the
+        no-capture limit, and truncated on the ply limit; it is then reset,
+        and its info holds the final "game_state" and "plies". Raises
+        ValueError, before playing anything, if any action is out of range
+        or illegal.
+        """
+        actions = np.asarray(actions)
+
+        if actions.shape != (self._count,) or not np.issubdtype(actions.dtype, np.integer):
+            raise ValueError(f"expected {self._count} integer actions")
+
+        for index, action in enumerate(actions):
+            # Checked before indexing, where a negative action would wrap
+            if not 0 <= action < MOVE_COUNT or not self._masks[index, action]:
+                raise ValueError(f"illegal action {action} in game {index}")
+
+        infos = [{} for _ in range(self._count)]
+        self._rewards[:] = 0
+        self._terminated[:] = False
+        self._truncated[:] = False
+
+        for index, action in enumerate(actions):
+            position = self._positions[index]
+            position.push(int(action))
+
+            state = position.get_game_state()
+
+            if state == "UNFINISHED":
+                self._update_observation(index, int(action))
+                continue
+
+            if state != "DRAW":
+                self._rewards[index] = 1
+                self._terminated[index] = True
+            elif position.get_draw() == "ply limit":
+                self._truncated[index] = True
+            else:
+                self._terminated[index] = True
+
+            infos[index] = {"game_state": state, "plies": position.get_ply()}
+            self._reset_game(index)
+
+        self._update_masks()
+
+        return (self._observations, self._rewards, self._terminated,
+                self._truncated, infos)
+
+    def _reset_game(self, index: int) -> None:
+        """Starts one game over and rewrites its observation. The caller
+        updates the masks.
+        """
+        position = Position(*self._rules)
+        self._positions[index] = position
+
+        planes = self._observations[index]
+        planes[:] = 0
+        board = position.get_board()
+
+        for row in range(8):
+            for col in range(8):
+                piece = board.get(row, col)
+
+                if piece is not None:
+                    planes[PIECE_PLANES[piece.get_color(), piece.get_type()], row, col] = 1
+
+        self._update_sideboard(index)
+
+    def _update_observation(self, index: int, move: int) -> None:
+        """Updates one game's planes after a move, rewriting only the squares
+        the move changed plus the reserve, point, and turn planes.
+        """
+        planes = self._observations[index]
+        board = self._positions[index].get_board()
+        orig, dest = divmod(move, 64)
+        squares = [divmod(dest, 8)]
+
+        if orig not in DROP_FAIRIES:
+            squares.append(divmod(orig, 8))
+
+        for row, col in squares:
+            planes[:PIECE_PLANE_COUNT, row, col] = 0
+            piece = board.get(row, col)
+
+            if piece is not None:
+                planes[PIECE_PLANES[piece.get_color(), piece.get_type()], row, col] = 1
+
+        self._update_sideboard(index)
+
+    def _update_sideboard(self, index: int) -> None:
+        """Refreshes one game's reserve, fairy point, and turn planes."""
+        planes = self._observations[index]
+        position = self._positions[index]
+
+        for color in COLORS:
+            player = position.get_player(color)
+            reserve = player.get_reserve()
+
+            for fairy in ("falcon", "hunter"):
+                planes[RESERVE_PLANES[color, fairy]] = fairy in reserve
+
+            planes[POINT_PLANES[color]] = player.get_fairy_points()
+
+        planes[TURN_PLANE] = position.get_color() == "black"
+
+    def _update_masks(self) -> None:
+        """Rewrites every game's legal-action mask from its observation
+        planes. Finished games are reset before this runs, so no game is
+        over and the draw rules never empty a mask.
+        """
+        planes = self._observations
+        count = self._count
+        pieces = planes[:, :PIECE_PLANE_COUNT].reshape(count, PIECE_PLANE_COUNT, 64) > 0
+        black = planes[:, TURN_PLANE, 0, 0] > 0
+        white_pieces = pieces[:, :PIECE_PLANE_COUNT // 2].any(axis=1)
+        black_pieces = pieces[:, PIECE_PLANE_COUNT // 2:].any(axis=1)
+        own = np.where(black[:, None], black_pieces, white_pieces)
+        enemy = np.where(black[:, None], white_pieces, black_pieces)
+        empty = ~(own | enemy)
+
+        # Plane of the mover's piece on each square, or the empty-square row
+        piece_planes = np.where(own, pieces.argmax(axis=1), PIECE_PLANE_COUNT)
+        origins = np.arange(64)
+        reach = (MOVE_TABLE[piece_planes, origins] & ~own[:, None, :]
+                 | PUSH_TABLE[piece_planes, origins] & empty[:, None, :]
+                 | CAPTURE_TABLE[piece_planes, origins] & enemy[:, None, :])
+        blocked = (~empty).astype(np.float32) @ BETWEEN_TABLE.T > 0
+
+        masks = self._masks
+        masks[:, :64 * 64] = reach.reshape(count, 64 * 64) & ~blocked
+
+        # Fairy entries, following Position.can_enter()
+        reserves = {
+            fairy: np.where(black, planes[:, RESERVE_PLANES["black", fairy], 0, 0],
+                            planes[:, RESERVE_PLANES["white", fairy], 0, 0]) > 0
+            for fairy in DROP_ORIGINS
+        }
+        reserve_size = sum(reserve.astype(int) for reserve in reserves.values())
+        points = np.where(black, planes[:, POINT_PLANES["black"], 0, 0],
+                          planes[:, POINT_PLANES["white"], 0, 0])
+        eligible = (reserve_size == 2) & (points >= 1) | (reserve_size == 1) & (points >= 2)
+        home = np.where(black[:, None], HOME_SQUARES["black"], HOME_SQUARES["white"]) & empty
+
+        for fairy, drop in DROP_ORIGINS.items():
+            masks[:, drop * 64:(drop + 1) * 64] = (reserves[fairy] & eligible)[:, None] & home
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+from ChessEngine import MOVE_COUNT, parse_move
+from ChessEnv import VectorChessEnv, PIECE_PLANES, RESERVE_PLANES, POINT_PLANES, TURN_PLANE, PLANE_COUNT
+
+
+def encode(position):
+    """Builds a position's observation planes from scratch."""
+    planes = np.zeros((PLANE_COUNT, 8, 8), dtype=np.float32)
+    board = position.get_board()
+
+    for row in range(8):
+        for col in range(8):
+            piece = board.get(row, col)
+            if piece is not None:
+                planes[PIECE_PLANES[piece.get_color(), piece.get_type()], row, col] = 1
+
+    for color in ("white", "black"):
+        player = position.get_player(color)
+        for fairy in player.get_reserve():
+            planes[RESERVE_PLANES[color, fairy]] = 1
+        planes[POINT_PLANES[color]] = player.get_fairy_points()
+
+    planes[TURN_PLANE] = position.get_color() == "black"
+
+    return planes
+
+
+class TestVectorChessEnv(unittest.TestCase):
+    """Tests the vectorized training environment."""
+    def test_reset(self):
+        """Tests observation and mask shapes in the starting position."""
+        env = VectorChessEnv(3)
+        observations, masks = env.reset()
+
+        self.assertEqual(observations.shape, (3, PLANE_COUNT, 8, 8))
+        self.assertEqual(masks.sum(axis=1).tolist(), [20, 20, 20])
+        self.assertEqual(observations[:, PIECE_PLANES["white", "pawn"]].sum(), 24)
+        self.assertTrue(masks[1, parse_move("e2e4")])
+
+    def test_random_rollouts(self):
+        """Tests in-place updates match planes built from scratch."""
+        rng = np.random.default_rng(31)
+        env = VectorChessEnv(4, ply_limit=60)
+        observations, masks = env.reset()
+        finished = 0
+
+        for _ in range(150):
+            actions = [rng.choice(np.flatnonzero(mask)) for mask in masks]
+            observations, rewards, terminated, truncated, infos = env.step(actions)
+
+            # The arrays are reused rather than reallocated
+            self.assertIs(observations, env.get_observations())
+
+            for index in range(env.get_count()):
+                np.testing.assert_array_equal(observations[index],
+                                              encode(env.get_position(index)))
+                self.assertEqual(set(np.flatnonzero(masks[index])),
+                                 set(env.get_position(index).legal_moves()))
+
+                if terminated[index] or truncated[index]:
+                    finished += 1
+                    self.assertEqual(env.get_position(index).get_ply(), 0)
+                    self.assertEqual(rewards[index],
+                                     0 if infos[index]["game_state"] == "DRAW" else 1)
+
+        self.assertGreater(finished, 0)
+
+    def test_king_capture_resets(self):
+        """Tests reward and automatic reset on king capture."""
+        env = VectorChessEnv(1)
+        env.reset()
+
+        for text in ("e2e4", "e7e5", "e1e2", "e8e7", "e2f3", "e7e8", "f3f4"):
+            env.step([parse_move(text)])
+
+        _, rewards, terminated, _, infos = env.step([parse_move("e5f4")])
+
+        self.assertEqual(rewards[0], 1)
+        self.assertTrue(terminated[0])
+        self.assertEqual(infos[0]["game_state"], "BLACK_WON")
+        self.assertEqual(env.get_action_masks()[0].sum(), 20)
+
+    def test_illegal_action(self):
+        """Tests that an illegal action is rejected before any game moves."""
+        env = VectorChessEnv(2)
+        env.reset()
+
+        with self.assertRaises(ValueError):
+            env.step([parse_move("e2e4"), parse_move("e2e5")])
+
+        self.assertEqual(env.get_position(0).get_ply(), 0)
+
+    def test_out_of_range_action(self):
+        """Tests that negative and too large actions are rejected."""
+        env = VectorChessEnv(1)
+        env.reset()
+
+        for action in (-860, -1, MOVE_COUNT):
+            with self.assertRaises(ValueError):
+                env.step([action])
+
+        self.assertEqual(env.get_position(0).get_ply(), 0)
+        self.assertEqual(env.get_position(0).get_board().get(6, 2).get_type(), "pawn")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Differential fuzzing of move generators. Seeded random games
+#                   are played on the reference implementation (ChessVar, with
+#                   Board.get_valid_moves() and enter_fairy_piece()) and on an
+#                   alternative backend side by side; after every ply their
+#                   full move sets and game states must agree. A divergence is
+#                   shrunk to a minimal move sequence that still reproduces it.
+#
+#                   Usage: python ChessFuzz.py [GAMES] [SEED] [MAX_PLIES]
+
+import contextlib
+import io
+import random
+from typing import NamedTuple
+
+from ChessVar import ChessVar
+from ChessEngine import MOVE_COUNT, Position, format_move, parse_move, square_name
+
+
+class ReferenceBackend:
+    """Backend driving ChessVar, the reference rules. Its output is
+    discarded. Move sets are read from Board.get_valid_moves(), and fairy
+    entries from the rule checks of enter_fairy_piece() on every square.
+
+    A backend has reset(), legal_moves() returning a set of moves in
+    ChessEngine notation, play(move), and game_state().
+    """
+    def __init__(self) -> None:
+        self._game = None
+
+    def reset(self) -> None:
+        """Starts a new game."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            self._game = ChessVar()
+
+    def legal_moves(self) -> "set[str]":
+        """Returns the moves available to the player whose turn it is."""
+        game = self._game
+
+        if game.get_game_state() != "UNFINISHED":
+            return set()
+
+        board = game._board
+        player = game.get_current_player()
+        color = player.get_color()
+        moves = set()
+
+        for row in range(8):
+            for col in range(8):
+                piece = board.get(row, col)
+
+                if piece is not None and piece.get_color() == color:
+                    orig = square_name(row * 8 + col)
+                    moves.update(orig + square_name(r * 8 + c)
+                                 for r, c in board.get_valid_moves(row, col))
+
+        # Fairy entries are probed with the checks enter_fairy_piece() runs,
+        # which change nothing
+        for token in ("F", "H") if color == "white" else ("f", "h"):
+            for square in range(64):
+                if game._check_fairy_entry(token, square_name(square)) is None:
+                    moves.add(f"{token.upper()}@{square_name(square)}")
+
+        return moves
+
+    def play(self, move: str) -> None:
+        """Plays a move, which must be legal."""
+        player = self._game.get_current_player()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            if "@" in move:
+                token = move[0] if player.get_color() == "white" else move[0].lower()
+                played = self._game.enter_fairy_piece(token, move[2:])
+            else:
+                played = self._game.make_move(move[:2], move[2:])
+
+        if not played:
+            raise ValueError(f"reference rejected {move}")
+
+    def game_state(self) -> str:
+        """Returns the game state string."""
+        return self._game.get_game_state()
+
+
+class PositionBackend:
+    """Backend driving the engine's Position. Move sets are built by asking
+    Position.is_valid_move() about every encoded move, so they come from the
+    single-move geometry checks rather than from get_valid_moves(). A random
+    sample of probes encoded moves is decided by is_legal() instead, so its
+    own checks, game over included, are fuzzed as well.
+    """
+    def __init__(self, probes: int = 256, seed: int = 0) -> None:
+        self._position = None
+        self._probes = probes
+        self._seed = seed
+        self._rng = None
+
+    def reset(self) -> None:
+        """Starts a new game."""
+        self._position = Position()
+        self._rng = random.Random(self._seed)
+
+    def legal_moves(self) -> "set[str]":
+        """Returns the moves available to the side to move."""
+        position = self._position
+        moves = set()
+
+        if position.get_game_state() == "UNFINISHED":
+            moves.update(move for move in range(MOVE_COUNT)
+                         if position.is_valid_move(move))
+
+        for move in self._rng.sample(range(MOVE_COUNT), min(self._probes, MOVE_COUNT)):
+            if position.is_legal(move):
+                moves.add(move)
+            else:
+                moves.discard(move)
+
+        return {format_move(move) for move in moves}
+
+    def play(self, move: str) -> None:
+        """Plays a move, which must be legal."""
+        self._position.push(parse_move(move))
+
+    def game_state(self) -> str:
+        """Returns the game state string."""
+        return self._position.get_game_state()
+
+
+class Divergence(NamedTuple):
+    """A move sequence after which the backends disagree, and what each
+    reported: (game state, sorted moves) for the reference and alternative.
+    """
+    moves: "list[str]"
+    reference: "tuple[str, list[str]]"
+    alternative: "tuple[str, list[str]]"
+
+
+def _snapshot(backend) -> "tuple[str, list[str]]":
+    """Returns a backend's game state and sorted move list."""
+    return backend.game_state(), sorted(backend.legal_moves())
+
+
+def check(moves: "list[str]", make_alternative,
+          make_reference=ReferenceBackend) -> "Divergence | None":
+    """Replays moves on fresh backends, comparing them before the first move
+    and after each one. Returns the Divergence at the first disagreement, or
+    None if they agree throughout. Raises ValueError if the reference
+    rejects a move.
+    """
+    reference = make_reference()
+    alternative = make_alternative()
+    reference.reset()
+    alternative.reset()
+
+    for ply in range(len(moves) + 1):
+        expected = _snapshot(reference)
+        actual = _snapshot(alternative)
+
+        if expected != actual:
+            return Divergence(moves[:ply], expected, actual)
+
+        if ply < len(moves):
+            reference.play(moves[ply])
+            alternative.play(moves[ply])
+
+    return None
+
+
+def shrink(divergence: Divergence, make_alternative,
+           make_reference=ReferenceBackend) -> Divergence:
+    """Cuts a divergence's sequence back to the first ply at which the
+    backends disagree, then removes moves one or two at a time for as long
+    as the shorter sequence is still legal and still diverges. Returns the
+    smallest divergence found.
+    """
+    best = check(divergence.moves, make_alternative, make_reference) or divergence
+    improved = True
+
+    while improved:
+        improved = False
+
+        for width in (2, 1):
+            for start in range(len(best.moves) - width + 1):
+                candidate = best.moves[:start] + best.moves[start + width:]
+
+                try:
+                    result = check(candidate, make_alternative, make_reference)
+                except ValueError:
+                    continue
+
+                if result is not None:
+                    best = result
+                    improved = True
+                    break
+
+            if improved:
+                break
+
+    return best
+
+
+def fuzz(make_alternative, games: int = 100, seed: int = 0, max_plies: int = 200,
+         make_reference=ReferenceBackend) -> "Divergence | None":
+    """Plays games seeded random games on the reference and the alternative
+    backend (each made by calling its factory), comparing move sets and game
+    states at every ply. Fairy entries are favored when available so that
+    falcons and hunters see play. Returns the shrunk first divergence, or
+    None if the backends always agreed.
+    """
+    rng = random.Random(seed)
+
+    for _ in range(games):
+        reference = make_reference()
+        alternative = make_alternative()
+        reference.reset()
+        alternative.reset()
+        moves = []
+
+        for _ in range(max_plies + 1):
+            expected = _snapshot(reference)
+            actual = _snapshot(alternative)
+
+            if expected != actual:
+                return shrink(Divergence(moves, expected, actual),
+                              make_alternative, make_reference)
+
+            legal = expected[1]
+
+            if not legal or len(moves) == max_plies:
+                break
+
+            entries = [move for move in legal if "@" in move]
+            move = rng.choice(entries if entries and rng.random() < 0.3 else legal)
+
+            reference.play(move)
+            alternative.play(move)
+            moves.append(move)
+
+    return None
+
+
+if __name__ == "__main__":
+    import sys
+
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    max_plies = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    found = fuzz(PositionBackend, games, seed, max_plies)
+
+    if found is None:
+        print(f"No divergence in {games} games (seed {seed})")
+    else:
+        print("Divergence after:", " ".join(found.moves) or "(start)")
+        print("Reference:  ", found.reference)
+        print("Alternative:", found.alternative)
@@ -0,0 +1,117 @@
+import unittest
+from ChessEngine import MOVE_COUNT, Position
+from ChessFuzz import (ReferenceBackend, PositionBackend, Divergence, check,
+                       shrink, fuzz)
+
+
+class NoBlackDoubleStep(PositionBackend):
+    """A deliberately broken backend that forgets black's two-square pawn
+    moves.
+    """
+    def legal_moves(self):
+        return {move for move in super().legal_moves()
+                if not (move[1] == "7" and move[3] == "5"
+                        and self._position.get_color() == "black"
+                        and self._position.get_board().get(1, ord(move[0]) - 97)
+                            .get_type() == "pawn")}
+
+
+class NoFairyEntries(PositionBackend):
+    """A deliberately broken backend that forgets fairy entries."""
+    def legal_moves(self):
+        return {move for move in super().legal_moves() if "@" not in move}
+
+
+class PlaysOnPosition(Position):
+    """A deliberately broken Position whose is_legal() ignores the game
+    being over.
+    """
+    def is_legal(self, move):
+        return self.is_valid_move(move)
+
+
+class PlaysOnAfterKingCapture(PositionBackend):
+    """A backend driving PlaysOnPosition, probing every move with is_legal()."""
+    def __init__(self):
+        super().__init__(probes=MOVE_COUNT)
+
+    def reset(self):
+        super().reset()
+        self._position = PlaysOnPosition()
+
+
+class TestFuzz(unittest.TestCase):
+    """Tests the differential fuzzing harness."""
+    def test_backends_agree(self):
+        """Tests that the engine Position agrees with the reference."""
+        self.assertIsNone(fuzz(PositionBackend, games=3, seed=37, max_plies=80))
+
+    def test_reference_moves(self):
+        """Tests the reference move set, including fairy entries."""
+        backend = ReferenceBackend()
+        backend.reset()
+        self.assertEqual(len(backend.legal_moves()), 20)
+
+        for move in ("e2e4", "d7d5", "d1g4", "c8g4"):
+            backend.play(move)
+
+        moves = backend.legal_moves()
+        self.assertIn("F@d1", moves)
+        self.assertIn("H@d1", moves)
+        self.assertNotIn("F@e3", moves)
+
+        # Probing entries leaves the game untouched
+        self.assertEqual(backend.legal_moves(), moves)
+
+        with self.assertRaises(ValueError):
+            backend.play("e4e6")
+
+    def test_check(self):
+        """Tests replaying a fixed sequence on both backends."""
+        self.assertIsNone(check(["e2e4", "e7e5"], PositionBackend))
+
+        divergence = check(["e2e4", "e7e5"], NoBlackDoubleStep)
+        self.assertEqual(divergence.moves, ["e2e4"])
+        self.assertIn("e7e5", divergence.reference[1])
+        self.assertNotIn("e7e5", divergence.alternative[1])
+
+    def test_check_probes_is_legal(self):
+        """Tests that is_legal() accepting moves after the game is over is
+        caught.
+        """
+        moves = ["e2e4", "e7e5", "e1e2", "e8e7", "e2f3", "e7e8", "f3f4", "e5f4"]
+        divergence = check(moves, PlaysOnAfterKingCapture)
+
+        self.assertEqual(divergence.moves, moves)
+        self.assertEqual(divergence.reference, ("BLACK_WON", []))
+        self.assertTrue(divergence.alternative[1])
+
+    def test_shrink(self):
+        """Tests that a divergence is shrunk to its shortest cause."""
+        long = Divergence(["g1f3", "g8f6", "e2e4", "d7d6", "d2d4", "b8c6",
+                           "d1d3", "c8g4", "f3g5", "g4d1"], None, None)
+        self.assertEqual(len(shrink(long, NoBlackDoubleStep).moves), 1)
+
+    def test_fuzz_finds_divergence(self):
+        """Tests that fuzzing finds and shrinks a fairy entry bug."""
+        divergence = fuzz(NoFairyEntries, games=20, seed=37, max_plies=200)
+
+        self.assertIsNotNone(divergence)
+        self.assertEqual(set(divergence.reference[1]) - set(divergence.alternative[1]),
+                         {move for move in divergence.reference[1] if "@" in move})
+
+        # No single move can be removed without losing the divergence
+        moves = divergence.moves
+        self.assertIsNone(check(moves[:-1], NoFairyEntries))
+
+        for index in range(len(moves)):
+            try:
+                shorter = check(moves[:index] + moves[index + 1:], NoFairyEntries)
+            except ValueError:
+                continue
+
+            self.assertIsNone(shorter)
+
+
+if __name__ == "__main__":
+    unittest.main()
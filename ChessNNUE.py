@@ -0,0 +1,275 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Learned evaluation in the style of NNUE. The first layer
+#                   is a sparse linear layer over (piece, square) features plus
+#                   reserve pieces and fairy points, seen from each side's
+#                   point of view. Its outputs are kept in an integer
+#                   accumulator that is updated by adding and subtracting
+#                   weight rows as Board.set() changes squares, so it is only
+#                   computed in full on reset; a small dense head turns the
+#                   accumulator into a score. Weights are stored in a compact
+#                   binary file (see load_network()).
+
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+from ChessEngine import PIECE_TYPES, Position
+
+
+FAIRY_TYPES = ("falcon", "hunter")
+
+# Features, from one side's point of view: its own pieces then the enemy's,
+# each by type and square (mirrored vertically for black), then the two
+# fairy pieces each side holds in reserve, then each side's fairy points
+# (0, 1, or 2 and up) as one-hot features
+PIECE_FEATURES = 2 * len(PIECE_TYPES) * 64
+RESERVE_OFFSET = PIECE_FEATURES
+POINTS_OFFSET = RESERVE_OFFSET + 2 * len(FAIRY_TYPES)
+FEATURE_COUNT = POINTS_OFFSET + 2 * 3
+
+# Accumulator values are clipped to [0, ACTIVATION_MAX] and scaled to [0, 1]
+# before the dense head
+ACTIVATION_MAX = 255
+
+# Weight file: magic, version, feature count, accumulator size, hidden size,
+# then the arrays of NNUEWeights in field order (little-endian; feature
+# weights and biases as int16, the head as float32)
+MAGIC = b"FHNN"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHH")
+
+
+class NNUEWeights(NamedTuple):
+    """Network weights. The feature transformer maps FEATURE_COUNT features
+    to an accumulator of size A per side; the head maps both sides'
+    activations (side to move first, 2A values) to a hidden layer of size H
+    and then to a score in centipawns for the side to move.
+    """
+    feature_weights: np.ndarray     # (FEATURE_COUNT, A) int16
+    feature_bias: np.ndarray        # (A,) int16
+    hidden_weights: np.ndarray      # (H, 2A) float32
+    hidden_bias: np.ndarray         # (H,) float32
+    output_weights: np.ndarray      # (H,) float32
+    output_bias: np.ndarray         # (1,) float32
+
+
+def random_weights(accumulator: int = 128, hidden: int = 16,
+                   seed: "int | None" = None) -> NNUEWeights:
+    """Returns randomly initialized weights, a starting point for training."""
+    rng = np.random.default_rng(seed)
+
+    return NNUEWeights(
+        rng.integers(-32, 33, (FEATURE_COUNT, accumulator)).astype(np.int16),
+        rng.integers(0, 65, accumulator).astype(np.int16),
+        (rng.standard_normal((hidden, 2 * accumulator)) / np.sqrt(2 * accumulator)).astype(np.float32),
+        np.zeros(hidden, dtype=np.float32),
+        (rng.standard_normal(hidden) * 100).astype(np.float32),
+        np.zeros(1, dtype=np.float32)
+    )
+
+
+def save_network(weights: NNUEWeights, path: str) -> None:
+    """Writes weights to a binary weight file."""
+    accumulator = weights.feature_bias.shape[0]
+    hidden = weights.hidden_bias.shape[0]
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, FEATURE_COUNT, accumulator, hidden))
+
+        for array, dtype in zip(weights, _dtypes()):
+            file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+
+def load_network(path: str) -> NNUEWeights:
+    """Reads weights from a binary weight file. Raises ValueError if the
+    file is not a weight file of this version and feature set, or its size
+    does not match its header.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError("truncated weight file")
+
+    magic, version, features, accumulator, hidden = HEADER.unpack_from(data)
+
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a weight file of this version")
+
+    if features != FEATURE_COUNT:
+        raise ValueError(f"weight file has {features} features, expected {FEATURE_COUNT}")
+
+    shapes = ((FEATURE_COUNT, accumulator), (accumulator,), (hidden, 2 * accumulator),
+              (hidden,), (hidden,), (1,))
+    arrays = []
+    offset = HEADER.size
+
+    for shape, dtype in zip(shapes, _dtypes()):
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+        if offset + size > len(data):
+            raise ValueError("truncated weight file")
+
+        arrays.append(np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)),
+                                    offset=offset).reshape(shape).copy())
+        offset += size
+
+    if offset != len(data):
+        raise ValueError("weight file has trailing data")
+
+    return NNUEWeights(*arrays)
+
+
+def _dtypes() -> tuple:
+    """Returns the on-disk dtype of each NNUEWeights field."""
+    return ("<i2", "<i2", "<f4", "<f4", "<f4", "<f4")
+
+
+def piece_features(row: int, col: int, piece) -> "tuple[int, int]":
+    """Returns a piece's feature index from white's and from black's point
+    of view.
+    """
+    square = row * 8 + col
+    type_index = PIECE_TYPES.index(piece.get_type()) * 64
+    white_own = piece.get_color() == "white"
+
+    return ((0 if white_own else PIECE_FEATURES // 2) + type_index + square,
+            (PIECE_FEATURES // 2 if white_own else 0) + type_index + (square ^ 56))
+
+
+def sideboard_features(position: Position) -> "tuple[list[int], list[int]]":
+    """Returns the active reserve and fairy point features of a position
+    from white's and from black's point of view.
+    """
+    features = ([], [])
+
+    for color in ("white", "black"):
+        player = position.get_player(color)
+        points = min(player.get_fairy_points(), 2)
+
+        for perspective, own in ((0, color == "white"), (1, color == "black")):
+            side = 0 if own else 1
+            features[perspective].extend(
+                RESERVE_OFFSET + side * len(FAIRY_TYPES) + FAIRY_TYPES.index(fairy)
+                for fairy in player.get_reserve())
+            features[perspective].append(POINTS_OFFSET + side * 3 + points)
+
+    return features
+
+
+class NNUEEvaluator:
+    """Evaluates one Position with an incrementally updated accumulator.
+    attach() registers the evaluator as a listener on the position's board,
+    after which every Board.set() (moves, captures, fairy entries, and their
+    undoing by pop()) adds and subtracts the affected weight rows. Reserve
+    and fairy point features are brought up to date when evaluate() notices
+    they changed. The accumulator is computed in full only by reset().
+    """
+    def __init__(self, weights: NNUEWeights) -> None:
+        self._weights = weights
+        self._rows = weights.feature_weights.astype(np.int32)
+        self._accumulator = np.zeros((2, weights.feature_bias.shape[0]), dtype=np.int32)
+        self._sideboard = ([], [])
+        self._position = None
+
+    def get_position(self) -> "Position | None":
+        """Returns the attached position, if any."""
+        return self._position
+
+    def attach(self, position: Position) -> None:
+        """Starts following a position, detaching from any previous one."""
+        self.detach()
+        self._position = position
+        position.get_board().add_listener(self._on_set)
+        self.reset()
+
+    def detach(self) -> None:
+        """Stops following the attached position."""
+        if self._position is not None:
+            self._position.get_board().remove_listener(self._on_set)
+            self._position = None
+
+    def reset(self) -> None:
+        """Recomputes the accumulator from every active feature of the
+        attached position.
+        """
+        board = self._position.get_board()
+        active = ([], [])
+
+        for row in range(8):
+            for col in range(8):
+                piece = board.get(row, col)
+
+                if piece is not None:
+                    white, black = piece_features(row, col, piece)
+                    active[0].append(white)
+                    active[1].append(black)
+
+        self._sideboard = sideboard_features(self._position)
+
+        for perspective in (0, 1):
+            features = active[perspective] + self._sideboard[perspective]
+            self._accumulator[perspective] = (self._weights.feature_bias
+                                              + self._rows[features].sum(axis=0))
+
+    def get_accumulator(self) -> np.ndarray:
+        """Returns the (2, A) accumulator, white's point of view first, with
+        reserve and fairy point features brought up to date.
+        """
+        self._update_sideboard()
+
+        return self._accumulator
+
+    def evaluate(self, position: Position) -> int:
+        """Returns the evaluation of the attached position in centipawns
+        from the point of view of the side to move.
+        """
+        accumulator = self.get_accumulator()
+        weights = self._weights
+
+        if position.get_color() == "white":
+            ordered = accumulator
+        else:
+            ordered = accumulator[::-1]
+
+        inputs = np.clip(ordered, 0, ACTIVATION_MAX).ravel().astype(np.float32)
+        inputs /= ACTIVATION_MAX
+        hidden = np.clip(weights.hidden_weights @ inputs + weights.hidden_bias, 0, 1)
+
+        return int(round(float(weights.output_weights @ hidden + weights.output_bias[0])))
+
+    def _on_set(self, row: int, col: int, old, new) -> None:
+        """Board listener: swaps the rows of the pieces leaving and entering
+        a square.
+        """
+        accumulator = self._accumulator
+
+        if old is not None:
+            white, black = piece_features(row, col, old)
+            accumulator[0] -= self._rows[white]
+            accumulator[1] -= self._rows[black]
+
+        if new is not None:
+            white, black = piece_features(row, col, new)
+            accumulator[0] += self._rows[white]
+            accumulator[1] += self._rows[black]
+
+    def _update_sideboard(self) -> None:
+        """Applies any change to the reserve and fairy point features."""
+        current = sideboard_features(self._position)
+
+        for perspective in (0, 1):
+            before = self._sideboard[perspective]
+            after = current[perspective]
+
+            if before != after:
+                for feature in set(before) - set(after):
+                    self._accumulator[perspective] -= self._rows[feature]
+
+                for feature in set(after) - set(before):
+                    self._accumulator[perspective] += self._rows[feature]
+
+        self._sideboard = current
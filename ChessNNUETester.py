@@ -0,0 +1,131 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from ChessEngine import Position, Searcher, parse_move, parse_position, position_text
+from ChessNNUE import (FEATURE_COUNT, NNUEEvaluator, load_network, random_weights,
+                       save_network)
+
+
+def play(position, *moves):
+    """Pushes moves given in text notation onto a position."""
+    for text in moves:
+        position.push(parse_move(text))
+
+
+def mirror(text):
+    """Returns position text with the board flipped and colors swapped."""
+    board, side, reserve, points = text.split()
+    white, black = points.split("/")
+
+    return " ".join([
+        "/".join(reversed(board.swapcase().split("/"))),
+        "b" if side == "w" else "w",
+        reserve.swapcase(),
+        f"{black}/{white}"
+    ])
+
+
+class TestNNUE(unittest.TestCase):
+    """Tests the incrementally updated network evaluator."""
+    def setUp(self):
+        self.weights = random_weights(64, 8, seed=42)
+
+    def fresh_accumulator(self, position):
+        """Returns the accumulator of a newly attached evaluator."""
+        evaluator = NNUEEvaluator(self.weights)
+        evaluator.attach(position)
+        accumulator = evaluator.get_accumulator().copy()
+        evaluator.detach()
+
+        return accumulator
+
+    def test_incremental_updates(self):
+        """Tests that updates match a full reset through pushes and pops."""
+        rng = random.Random(42)
+        position = Position()
+        evaluator = NNUEEvaluator(self.weights)
+        evaluator.attach(position)
+
+        play(position, "e2e4", "d7d5", "d1g4", "c8g4", "F@d1")
+
+        for _ in range(200):
+            moves = position.legal_moves()
+
+            if moves and rng.random() < 0.7:
+                position.push(rng.choice(moves))
+            elif position.get_ply():
+                position.pop()
+
+            np.testing.assert_array_equal(evaluator.get_accumulator(),
+                                          self.fresh_accumulator(position))
+
+    def test_fairy_entry(self):
+        """Tests reserve and fairy point features through an entry."""
+        position = Position()
+        evaluator = NNUEEvaluator(self.weights)
+        evaluator.attach(position)
+
+        for move in ("e2e4", "d7d5", "d1g4", "c8g4", "F@d1"):
+            before = evaluator.get_accumulator().copy()
+            play(position, move)
+            self.assertFalse(np.array_equal(evaluator.get_accumulator(), before))
+            np.testing.assert_array_equal(evaluator.get_accumulator(),
+                                          self.fresh_accumulator(position))
+
+    def test_symmetry(self):
+        """Tests that mirroring a position keeps the side to move's score."""
+        position = Position()
+        play(position, "e2e4", "d7d5", "e4d5", "d8d5", "b1c3")
+        text = position_text(position)
+        mirrored = parse_position(mirror(text))
+        evaluator = NNUEEvaluator(self.weights)
+
+        evaluator.attach(position)
+        score = evaluator.evaluate(position)
+        evaluator.attach(mirrored)
+
+        self.assertEqual(evaluator.evaluate(mirrored), score)
+        self.assertIs(evaluator.get_position(), mirrored)
+
+    def test_weight_file(self):
+        """Tests saving and loading weights and rejecting bad files."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "net.bin")
+            save_network(self.weights, path)
+
+            loaded = load_network(path)
+            for saved, read in zip(self.weights, loaded):
+                np.testing.assert_array_equal(saved, read)
+
+            # Feature weights are stored as 16-bit integers
+            self.assertLess(os.path.getsize(path), FEATURE_COUNT * 64 * 2 + 8192)
+
+            with open(path, "rb") as file:
+                data = file.read()
+
+            for bad in (b"XXXX" + data[4:], data[:-4], data + b"\0", data[:6]):
+                with open(path, "wb") as file:
+                    file.write(bad)
+
+                with self.assertRaises(ValueError):
+                    load_network(path)
+
+    def test_search(self):
+        """Tests searching with the network evaluator."""
+        position = Position()
+        play(position, "e2e4", "e7e5")
+        evaluator = NNUEEvaluator(self.weights)
+
+        result = Searcher(evaluator=evaluator).search(position, depth=2)
+
+        self.assertTrue(position.is_legal(result.move))
+        self.assertIsNone(evaluator.get_position())
+        self.assertEqual(position.get_ply(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
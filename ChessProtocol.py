@@ -0,0 +1,223 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Headless engine mode speaking a UCI-like line protocol over
+#                   stdin/stdout, so GUIs and tournament managers can drive the
+#                   engine without scraping the interactive board output. One
+#                   long-lived ProtocolEngine keeps its transposition table
+#                   across games and extends the current position in place
+#                   when a new move list continues the previous one.
+#
+#                   Commands:
+#                     uci | isready | ucinewgame | quit
+#                     position startpos [moves <move> ...]
+#                     position fen <board> <side> <reserve> <points> [moves ...]
+#                     go [depth <n>] [nodes <n>] [movetime <ms>] [wtime <ms>]
+#                        [btime <ms>] [winc <ms>] [binc <ms>] [infinite]
+#                   A "go" without any limit searches for DEFAULT_MOVETIME.
+#                     stop
+#                   Moves use ChessEngine notation: "e2e4", or "F@e2" and
+#                   "H@e2" to enter a falcon or hunter.
+
+import sys
+import threading
+
+from ChessEngine import (MATE, START_TEXT, Searcher, TranspositionTable,
+                         format_move, parse_move, parse_position)
+
+
+# Seconds searched by a "go" that names no depth, node, or time limit
+DEFAULT_MOVETIME = 3.0
+
+
+class ProtocolEngine:
+    """Handles protocol commands one line at a time and writes responses to
+    an output stream. Searches run in a background thread so that "stop"
+    and "isready" are answered while the engine thinks.
+    """
+    def __init__(self, output=sys.stdout, table_size: int = 1 << 20) -> None:
+        self._output = output
+        self._lock = threading.Lock()
+        self._searcher = Searcher(TranspositionTable(table_size))
+        self._base = START_TEXT
+        self._moves = []
+        self._position = parse_position(START_TEXT)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def send(self, line: str) -> None:
+        """Writes one response line and flushes it."""
+        with self._lock:
+            self._output.write(line + "\n")
+            self._output.flush()
+
+    def run(self, stream=sys.stdin) -> None:
+        """Reads and handles commands until "quit" or the end of input."""
+        for line in stream:
+            if not self.handle(line):
+                break
+
+        self.wait()
+
+    def handle(self, line: str) -> bool:
+        """Handles one command line. Returns False once "quit" is received.
+        Unknown commands are ignored, as UCI engines do.
+        """
+        fields = line.split()
+
+        if not fields:
+            return True
+
+        command, args = fields[0], fields[1:]
+
+        if command == "uci":
+            self.send("id name FalconHunter")
+            self.send("id author mattmuroya")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.wait()
+            self._set_position(START_TEXT, [])
+        elif command == "position":
+            self.wait()
+            self._position_command(args)
+        elif command == "go":
+            self.wait()
+            self._go_command(args)
+        elif command == "stop":
+            self._stop.set()
+            self.wait()
+        elif command == "quit":
+            self._stop.set()
+            self.wait()
+            return False
+
+        return True
+
+    def wait(self) -> None:
+        """Waits for any running search to report its best move."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _position_command(self, args: "list[str]") -> None:
+        """Handles "position startpos|fen ... [moves ...]"."""
+        if "moves" in args:
+            split = args.index("moves")
+            setup, moves = args[:split], args[split + 1:]
+        else:
+            setup, moves = args, []
+
+        if setup[:1] == ["startpos"]:
+            base = START_TEXT
+        elif setup[:1] == ["fen"]:
+            base = " ".join(setup[1:])
+        else:
+            self.send("info string malformed position command")
+            return
+
+        try:
+            self._set_position(base, moves)
+        except ValueError as error:
+            self.send(f"info string {error}")
+
+    def _set_position(self, base: str, moves: "list[str]") -> None:
+        """Sets up the base position and plays the moves. When the base is
+        unchanged and the moves continue the current game, only the new moves
+        are played. Raises ValueError, resetting to the base position, if the
+        text or a move is malformed or illegal.
+        """
+        known = len(self._moves)
+
+        if base != self._base or moves[:known] != self._moves:
+            self._position = parse_position(base)
+            self._base = base
+            self._moves = []
+            known = 0
+
+        for text in moves[known:]:
+            move = parse_move(text)
+
+            if move is None or not self._position.is_legal(move):
+                self._position = parse_position(base)
+                self._moves = []
+                raise ValueError(f"illegal move {text}")
+
+            self._position.push(move)
+            self._moves.append(text)
+
+    def _go_command(self, args: "list[str]") -> None:
+        """Handles "go" by starting a background search."""
+        limits = {}
+        index = 0
+
+        while index < len(args):
+            name = args[index]
+
+            if name == "infinite":
+                limits[name] = True
+                index += 1
+            elif index + 1 < len(args) and args[index + 1].lstrip("-").isdigit():
+                limits[name] = int(args[index + 1])
+                index += 2
+            else:
+                index += 1
+
+        depth = limits.get("depth", 64)
+        nodes = limits.get("nodes")
+        movetime = None
+
+        if "movetime" in limits:
+            movetime = limits["movetime"] / 1000
+        elif not limits.get("infinite"):
+            side = "w" if self._position.get_color() == "white" else "b"
+
+            if f"{side}time" in limits:
+                remaining = limits[f"{side}time"]
+                increment = limits.get(f"{side}inc", 0)
+                movetime = max(remaining / 30 + increment / 2, 10) / 1000
+            elif "depth" not in limits and nodes is None:
+                movetime = DEFAULT_MOVETIME
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._search,
+                                        args=(depth, movetime, self._stop,
+                                              bool(limits.get("infinite")), nodes),
+                                        daemon=True)
+        self._thread.start()
+
+    def _search(self, depth: int, movetime: "float | None", stop,
+                infinite: bool = False, nodes: "int | None" = None) -> None:
+        """Background thread body: searches and reports the best move. An
+        infinite search can finish on its own (a forced king capture, or the
+        depth limit), but its best move is held back until "stop" arrives.
+        """
+        result = self._searcher.search(self._position, depth, movetime, stop,
+                                       on_iteration=self._report, nodes=nodes)
+
+        if infinite:
+            stop.wait()
+
+        if result.move is None:
+            self.send("bestmove (none)")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {format_move(result.move)} ponder {format_move(result.pv[1])}")
+        else:
+            self.send(f"bestmove {format_move(result.move)}")
+
+    def _report(self, result) -> None:
+        """Sends an info line for a completed search depth."""
+        if abs(result.score) >= MATE - 512:
+            plies = MATE - abs(result.score)
+            moves = (plies + 1) // 2
+            score = f"mate {moves if result.score > 0 else -moves}"
+        else:
+            score = f"cp {result.score}"
+
+        pv = " ".join(format_move(move) for move in result.pv)
+        self.send(f"info depth {result.depth} score {score} nodes {result.nodes} pv {pv}")
+
+
+if __name__ == "__main__":
+    ProtocolEngine().run()
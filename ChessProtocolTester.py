@@ -0,0 +1,119 @@
+import io
+import time
+import unittest
+from unittest import mock
+import ChessProtocol
+from ChessEngine import START_TEXT, parse_move
+from ChessProtocol import ProtocolEngine
+
+
+class TestProtocolEngine(unittest.TestCase):
+    """Tests the line-based engine protocol."""
+    def setUp(self):
+        self.output = io.StringIO()
+        self.engine = ProtocolEngine(self.output, table_size=1 << 12)
+
+    def lines(self):
+        """Returns the response lines written so far."""
+        return self.output.getvalue().splitlines()
+
+    def test_handshake(self):
+        """Tests uci and isready."""
+        self.engine.run(io.StringIO("uci\nisready\nquit\n"))
+
+        self.assertEqual(self.lines()[-2:], ["uciok", "readyok"])
+
+    def test_go_depth(self):
+        """Tests a depth-limited search from a move list."""
+        self.engine.run(io.StringIO(
+            "position startpos moves e2e4 e7e5 d1h5 b8c6 f1c4 g8f6\n"
+            "go depth 3\n"
+        ))
+
+        self.assertTrue(self.lines()[-1].startswith("bestmove h5f7"))
+        self.assertIn("score mate 2", self.lines()[-2])
+
+    def test_go_nodes(self):
+        """Tests that a node limit ends the search by itself."""
+        self.engine.handle("position startpos")
+        self.engine.handle("go nodes 100")
+        self.engine.wait()
+
+        self.assertTrue(self.lines()[-1].startswith("bestmove "))
+        nodes = [int(line.split()[line.split().index("nodes") + 1])
+                 for line in self.lines() if line.startswith("info")]
+        self.assertTrue(all(count <= 100 for count in nodes))
+
+    def test_bare_go_uses_default_movetime(self):
+        """Tests that a go without limits stops after the default movetime."""
+        self.engine.handle("position startpos")
+
+        with mock.patch.object(ChessProtocol, "DEFAULT_MOVETIME", 0.2):
+            self.engine.handle("go")
+
+        started = time.perf_counter()
+        self.engine.wait()
+
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertTrue(self.lines()[-1].startswith("bestmove "))
+
+    def test_fen_and_fairy_moves(self):
+        """Tests position text and fairy entry moves."""
+        fen = "rn1qkbnr/ppp1pppp/8/3p4/4P1b1/8/PPPP1PPP/RNB1KBNR w FHfh 1/0"
+        self.engine.handle(f"position fen {fen} moves F@d1 g4d1")
+        position = self.engine._position
+
+        self.assertEqual(position.get_player("white").get_reserve(), ["hunter"])
+        self.assertEqual(position.get_player("white").get_fairy_points(), 1)
+        self.assertEqual(position.get_color(), "white")
+
+        self.engine.handle("go movetime 50")
+        self.engine.wait()
+        move = parse_move(self.lines()[-1].split()[1])
+        self.assertTrue(position.is_legal(move))
+
+    def test_incremental_position(self):
+        """Tests that extending the move list keeps the same position."""
+        self.engine.handle("position startpos moves e2e4")
+        position = self.engine._position
+
+        self.engine.handle("position startpos moves e2e4 e7e5")
+        self.assertIs(self.engine._position, position)
+        self.assertEqual(position.get_ply(), 2)
+
+        self.engine.handle("position startpos moves d2d4")
+        self.assertEqual(self.engine._position.get_ply(), 1)
+
+    def test_illegal_move(self):
+        """Tests that an illegal move is reported and the base kept."""
+        self.engine.handle("position startpos moves e2e5")
+
+        self.assertEqual(self.lines(), ["info string illegal move e2e5"])
+        self.assertEqual(self.engine._position.get_ply(), 0)
+        self.assertEqual(self.engine._base, START_TEXT)
+
+    def test_stop(self):
+        """Tests that stop ends an infinite search with a best move."""
+        self.engine.handle("position startpos")
+        self.engine.handle("go infinite")
+        self.engine.handle("stop")
+
+        self.assertTrue(self.lines()[-1].startswith("bestmove "))
+
+    def test_infinite_waits_for_stop(self):
+        """Tests that an infinite search that finishes early holds its best
+        move until stop.
+        """
+        fen = "4k3/8/8/8/8/8/4Q3/4K3 w FHfh 0/0"
+        self.engine.handle(f"position fen {fen}")
+        self.engine.handle("go infinite")
+        time.sleep(0.5)
+
+        self.assertFalse(any(line.startswith("bestmove") for line in self.lines()))
+
+        self.engine.handle("stop")
+        self.assertEqual(self.lines()[-1], "bestmove e2e8")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,354 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Solver for "capture the king in N" puzzles. Capturing a
+#                   king ends the game at once, so a puzzle is a pure AND/OR
+#                   proof: the side to move must capture the enemy king within
+#                   N of its own moves whatever the defense. PuzzleSolver runs
+#                   depth-first proof-number search (df-pn) over the print-free
+#                   Position with a fixed-size proof table, counting fairy
+#                   entries as attacking moves like any other. solve_file()
+#                   spreads the puzzles of a file across worker processes.
+#
+#                   Puzzle files hold one puzzle per line: position text (see
+#                   ChessEngine.position_text()) followed by N. Blank lines and
+#                   lines starting with "#" are skipped.
+#
+#                   Usage: python ChessPuzzles.py FILE [--nodes N] [--workers N]
+
+import multiprocessing
+from typing import NamedTuple
+
+from ChessEngine import Position, SearchAborted, format_move, parse_position
+
+
+# Proof and disproof numbers at or above this are treated as infinite
+PROOF_INFINITY = 1 << 30
+
+PROVEN = (0, PROOF_INFINITY)
+DISPROVEN = (PROOF_INFINITY, 0)
+
+
+class ProofTable:
+    """Fixed-capacity table of proof and disproof numbers, indexed by key. A
+    new entry simply overwrites whatever shares its slot, so memory stays
+    bounded however large the search grows.
+    """
+    def __init__(self, size: int = 1 << 16) -> None:
+        if size & (size - 1):
+            raise ValueError("table size must be a power of two")
+
+        self._size = size
+        self._keys = [None] * size
+        self._numbers = [None] * size
+
+    def probe(self, key: int) -> "tuple[int, int] | None":
+        """Returns the (proof, disproof) numbers stored for key, if any."""
+        index = key & (self._size - 1)
+
+        return self._numbers[index] if self._keys[index] == key else None
+
+    def store(self, key: int, numbers: "tuple[int, int]") -> None:
+        """Stores (proof, disproof) numbers for key."""
+        index = key & (self._size - 1)
+        self._keys[index] = key
+        self._numbers[index] = numbers
+
+    def clear(self) -> None:
+        """Empties the table."""
+        self._keys = [None] * self._size
+
+
+class PuzzleResult(NamedTuple):
+    """Outcome of a puzzle: "proven" if the side to move captures the enemy
+    king within the move limit by force, "disproven" if it cannot, or
+    "unknown" if the node budget ran out; the proving line as encoded moves
+    (ending with the king capture, empty unless proven); and the number of
+    nodes expanded.
+    """
+    status: str
+    line: "list[int]"
+    nodes: int
+
+
+class PuzzleSolver:
+    """Depth-first proof-number search for forced king captures. Nodes where
+    the attacker moves are OR nodes and nodes where the defender moves are
+    AND nodes; each is keyed by its position hash and the number of attacker
+    moves left, which strictly decreases, so the search graph has no cycles.
+    """
+    def __init__(self, table: "ProofTable | None" = None,
+                 nodes: "int | None" = None) -> None:
+        self._table = table if table is not None else ProofTable()
+        self._node_limit = nodes
+        self._nodes = 0
+        self._attacker = None
+
+    def get_table(self) -> ProofTable:
+        """Returns the solver's proof table."""
+        return self._table
+
+    def solve(self, position: Position, moves: int) -> PuzzleResult:
+        """Determines whether the side to move can capture the enemy king
+        within moves of its own moves. The position is left as it was.
+        """
+        self._nodes = 0
+        self._attacker = position.get_color()
+        ply = position.get_ply()
+        numbers = self._terminal(position, moves, True)
+
+        try:
+            if numbers is None:
+                numbers = self._search(position, moves, True,
+                                       PROOF_INFINITY, PROOF_INFINITY)
+
+            if numbers[0] != 0:
+                status = "disproven" if numbers[1] == 0 else "unknown"
+                return PuzzleResult(status, [], self._nodes)
+
+            line = self._proving_line(position, moves)
+        except SearchAborted:
+            while position.get_ply() > ply:
+                position.pop()
+
+            return PuzzleResult("unknown", [], self._nodes)
+
+        return PuzzleResult("proven", line, self._nodes)
+
+    def _key(self, position: Position, remaining: int) -> int:
+        """Returns the table key of a node."""
+        return position.get_hash() * 64 + remaining
+
+    def _king_capture(self, position: Position) -> "int | None":
+        """Returns a move of the side to move that captures a king, if any."""
+        for move in position.capture_moves():
+            if position.get_capture(move).get_type() == "king":
+                return move
+
+        return None
+
+    def _terminal(self, position: Position, remaining: int,
+                  is_or: bool) -> "tuple[int, int] | None":
+        """Returns the proof and disproof numbers of a node decided without
+        search, or None. The game being over decides a node, as does a king
+        capture available to either side: the attacker's proves its OR node,
+        and the defender's disproves its AND node. An OR node with one move
+        left and no king capture is disproven.
+        """
+        winner = position.get_winner()
+
+        if winner is not None:
+            return PROVEN if winner == self._attacker else DISPROVEN
+
+        if position.get_game_state() == "DRAW" or remaining <= 0:
+            return DISPROVEN
+
+        if self._king_capture(position) is not None:
+            return PROVEN if is_or else DISPROVEN
+
+        if is_or and remaining == 1:
+            return DISPROVEN
+
+        return None
+
+    def _search(self, position: Position, remaining: int, is_or: bool,
+                proof_limit: int, disproof_limit: int) -> "tuple[int, int]":
+        """Expands a node until its proof number reaches proof_limit or its
+        disproof number reaches disproof_limit, then stores and returns its
+        (proof, disproof) numbers. Raises SearchAborted once the node budget
+        is spent.
+        """
+        self._nodes += 1
+
+        if self._node_limit is not None and self._nodes > self._node_limit:
+            raise SearchAborted()
+
+        key = self._key(position, remaining)
+        child_remaining = remaining - 1 if is_or else remaining
+        children = []
+
+        for move in position.legal_moves():
+            position.push(move)
+            terminal = self._terminal(position, child_remaining, not is_or)
+            children.append((move, self._key(position, child_remaining), terminal))
+            position.pop()
+
+        # Children's numbers are kept here as well as in the table, so a
+        # result evicted from the table is not mistaken for a fresh child
+        numbers = [
+            terminal if terminal is not None
+            else self._table.probe(child_key) or (1, 1)
+            for _, child_key, terminal in children
+        ]
+
+        while True:
+            proof, disproof = _combine(numbers, is_or)
+
+            if proof >= proof_limit or disproof >= disproof_limit:
+                break
+
+            # Descend into the most proving child: smallest proof number at
+            # an OR node, smallest disproof number at an AND node
+            side = 0 if is_or else 1
+            order = sorted(range(len(numbers)), key=lambda index: numbers[index][side])
+            best = order[0]
+            second = numbers[order[1]][side] if len(order) > 1 else PROOF_INFINITY
+            child_proof, child_disproof = numbers[best]
+
+            if is_or:
+                child_proof_limit = min(proof_limit, second + 1)
+                child_disproof_limit = min(PROOF_INFINITY,
+                                           disproof_limit - disproof + child_disproof)
+            else:
+                child_proof_limit = min(PROOF_INFINITY,
+                                        proof_limit - proof + child_proof)
+                child_disproof_limit = min(disproof_limit, second + 1)
+
+            position.push(children[best][0])
+            numbers[best] = self._search(position, child_remaining, not is_or,
+                                         child_proof_limit, child_disproof_limit)
+            position.pop()
+
+        self._table.store(key, (proof, disproof))
+
+        return proof, disproof
+
+    def _proving_line(self, position: Position, remaining: int) -> "list[int]":
+        """Follows a proof from a proven OR node to the king capture and
+        returns the moves. Each side plays the first move whose child the
+        table shows proven; if the table has lost every such child, the
+        children are searched again until one is proven.
+        """
+        line = []
+        is_or = True
+
+        while True:
+            if is_or:
+                capture = self._king_capture(position)
+
+                if capture is not None:
+                    line.append(capture)
+                    break
+
+            child_remaining = remaining - 1 if is_or else remaining
+            chosen = self._proven_child(position, child_remaining, not is_or)
+
+            if chosen is None:
+                chosen = self._prove_child(position, child_remaining, not is_or)
+
+            line.append(chosen)
+            position.push(chosen)
+            remaining = child_remaining
+            is_or = not is_or
+
+        for _ in range(len(line) - 1):
+            position.pop()
+
+        return line
+
+    def _proven_child(self, position: Position, remaining: int,
+                      is_or: bool) -> "int | None":
+        """Returns the first move leading to a child known to be proven,
+        given the child's attacker moves left and node type, or None.
+        """
+        for move in position.legal_moves():
+            position.push(move)
+            numbers = (self._terminal(position, remaining, is_or)
+                       or self._table.probe(self._key(position, remaining)))
+            position.pop()
+
+            if numbers is not None and numbers[0] == 0:
+                return move
+
+        return None
+
+    def _prove_child(self, position: Position, remaining: int, is_or: bool) -> int:
+        """Searches the children of a proven node in turn, given the
+        children's attacker moves left and node type, and returns the first
+        move whose child is proven.
+        """
+        for move in position.legal_moves():
+            position.push(move)
+            numbers = (self._terminal(position, remaining, is_or)
+                       or self._search(position, remaining, is_or,
+                                       PROOF_INFINITY, PROOF_INFINITY))
+            position.pop()
+
+            if numbers[0] == 0:
+                return move
+
+        raise ValueError("node is not proven")
+
+
+def _combine(numbers: "list[tuple[int, int]]", is_or: bool) -> "tuple[int, int]":
+    """Returns a node's (proof, disproof) numbers from its children's. A
+    node without moves is disproven.
+    """
+    if not numbers:
+        return DISPROVEN
+
+    proofs = [proof for proof, _ in numbers]
+    disproofs = [disproof for _, disproof in numbers]
+
+    if is_or:
+        return min(proofs), min(PROOF_INFINITY, sum(disproofs))
+
+    return min(PROOF_INFINITY, sum(proofs)), min(disproofs)
+
+
+def read_puzzles(path: str):
+    """Streams puzzles from a file. Yields (position text, moves) pairs."""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            fields = line.split()
+
+            if fields and not fields[0].startswith("#"):
+                yield " ".join(fields[:-1]), int(fields[-1])
+
+
+def solve_puzzle(text: str, moves: int, nodes: "int | None" = None,
+                 table_size: int = 1 << 16) -> dict:
+    """Solves one puzzle given as position text and a move limit. Returns a
+    dictionary with the "position", "moves", "status", proving "line" in
+    text notation, and "nodes" expanded, or an "error" if the position text
+    is malformed.
+    """
+    record = {"position": text, "moves": moves}
+
+    try:
+        position = parse_position(text)
+    except ValueError as error:
+        record["error"] = str(error)
+        return record
+
+    result = PuzzleSolver(ProofTable(table_size), nodes).solve(position, moves)
+    record.update(status=result.status,
+                  line=[format_move(move) for move in result.line],
+                  nodes=result.nodes)
+
+    return record
+
+
+def solve_file(path: str, workers: "int | None" = None, nodes: "int | None" = None,
+               table_size: int = 1 << 16) -> "list[dict]":
+    """Solves every puzzle in a file across a pool of worker processes and
+    returns their records (see solve_puzzle()) in file order.
+    """
+    tasks = [(text, moves, nodes, table_size) for text, moves in read_puzzles(path)]
+
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(solve_puzzle, tasks)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Solve king capture puzzles.")
+    parser.add_argument("file")
+    parser.add_argument("--nodes", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    for record in solve_file(args.file, args.workers, args.nodes):
+        print(json.dumps(record))
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from ChessEngine import Position, format_move, parse_position, position_text, replay
+from ChessPuzzles import ProofTable, PuzzleSolver, read_puzzles, solve_file
+
+
+# Scholar's mate shape: Qxf7 and the queen takes the king next move
+QUEEN_PUZZLE = position_text(replay(["e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "g8f6"]))
+
+# White holds a fairy point; a falcon entering on the long diagonal traps
+# the black king, which can only step onto another attacked square
+FALCON_PUZZLE = "6bk/7p/8/8/8/8/8/7K w FHfh 1/0"
+
+
+class TestPuzzleSolver(unittest.TestCase):
+    """Tests the proof-number king capture solver."""
+    def check_line(self, text, line):
+        """Checks that a proving line is legal and ends in a king capture."""
+        position = parse_position(text)
+        attacker = position.get_color()
+
+        for move in line:
+            self.assertTrue(position.is_legal(move), format_move(move))
+            position.push(move)
+
+        self.assertEqual(position.get_winner(), attacker)
+
+    def test_queen_puzzle(self):
+        """Tests a capture in two proven and a capture in one disproven."""
+        position = parse_position(QUEEN_PUZZLE)
+        start = position.get_hash()
+
+        result = PuzzleSolver().solve(position, 2)
+        self.assertEqual(result.status, "proven")
+        self.assertEqual(format_move(result.line[0]), "h5f7")
+        self.assertEqual(len(result.line), 3)
+        self.assertGreater(result.nodes, 0)
+        self.check_line(QUEEN_PUZZLE, result.line)
+        self.assertEqual(position.get_hash(), start)
+
+        self.assertEqual(PuzzleSolver().solve(position, 1).status, "disproven")
+
+    def test_fairy_entry(self):
+        """Tests that fairy entries count as attacking moves."""
+        result = PuzzleSolver().solve(parse_position(FALCON_PUZZLE), 2)
+
+        self.assertEqual(result.status, "proven")
+        self.assertTrue(format_move(result.line[0]).startswith("F@"))
+        self.check_line(FALCON_PUZZLE, result.line)
+
+        # Without the point the falcon cannot enter
+        result = PuzzleSolver().solve(parse_position(FALCON_PUZZLE.replace("1/0", "0/0")), 2)
+        self.assertEqual(result.status, "disproven")
+
+    def test_defender_king_capture(self):
+        """Tests that a defense capturing the attacker's king refutes it."""
+        # The white queen takes the king only if black cannot take first
+        text = "4k3/8/8/8/8/8/3q4/4K2Q w - 0/0"
+        self.assertEqual(PuzzleSolver().solve(parse_position(text), 2).status, "disproven")
+
+    def test_small_table(self):
+        """Tests that a tiny table still proves the puzzle."""
+        result = PuzzleSolver(ProofTable(4)).solve(parse_position(QUEEN_PUZZLE), 3)
+
+        self.assertEqual(result.status, "proven")
+        self.check_line(QUEEN_PUZZLE, result.line)
+
+    def test_node_budget(self):
+        """Tests that a spent budget is reported and the position restored."""
+        position = Position()
+        result = PuzzleSolver(nodes=50).solve(position, 3)
+
+        self.assertEqual(result.status, "unknown")
+        self.assertEqual(result.line, [])
+        self.assertEqual(position.get_ply(), 0)
+
+    def test_solve_file(self):
+        """Tests solving a puzzle file across worker processes."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "puzzles.txt")
+
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"# king capture puzzles\n{QUEEN_PUZZLE} 2\n\n"
+                           f"{FALCON_PUZZLE} 1\n{FALCON_PUZZLE} 2\nbad w - 0/0 1\n")
+
+            self.assertEqual(len(list(read_puzzles(path))), 4)
+            records = solve_file(path, workers=2)
+
+        self.assertEqual([record.get("status") for record in records],
+                         ["proven", "disproven", "proven", None])
+        self.assertEqual(records[0]["line"][0], "h5f7")
+        self.assertIn("error", records[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,272 @@
+# Author:           Matt Muroya
+# GitHub username:  mattmuroya
+# Date:             2026-10-19
+# Description:      Tunes the engine's material and piece-square weights
+#                   against game outcomes. Quiet positions are extracted from
+#                   self-play records and stored as compact NumPy piece codes;
+#                   feature matrices are built from them one chunk at a time,
+#                   so memory stays bounded by the chunk size. The weights are
+#                   fitted by full-batch gradient descent on the logistic loss
+#                   of each position's predicted score against its game's
+#                   result, and exported as JSON for ChessEngine.load_weights().
+#
+#                   Usage: python ChessTuner.py OUTPUT.json FILE [FILE ...]
+#                          [--epochs N] [--chunk-size N] [--learning-rate CP]
+
+import json
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from ChessEngine import (PIECE_CODES, PIECE_TYPES, WEIGHTS, Position, parse_move,
+                         read_records, see, structure_terms)
+
+
+# Feature columns: one material count difference per piece type (white minus
+# black), then one piece-square column per piece type and square, indexed
+# from each side's own point of view like WEIGHTS["piece_square"]
+MATERIAL_COLUMNS = len(PIECE_TYPES)
+FEATURE_COUNT = MATERIAL_COLUMNS + len(PIECE_TYPES) * 64
+
+RESULT_TARGETS = {"WHITE_WON": 1.0, "BLACK_WON": 0.0, "DRAW": 0.5}
+
+# Converts centipawns to the logistic scale: a 400 cp edge is 10:1 odds
+SCORE_SCALE = math.log(10) / 400
+
+
+class TuningSet(NamedTuple):
+    """Quiet positions for tuning: codes holds 64 piece codes per position
+    (int8, a8 first), base the evaluation terms not being tuned (pawn
+    structure and reserves, centipawns from white's point of view), and
+    targets the game results from white's point of view (1, 0.5, or 0).
+    """
+    codes: np.ndarray
+    base: np.ndarray
+    targets: np.ndarray
+
+
+def is_quiet(position: Position) -> bool:
+    """Returns True if the side to move has no capture that wins material
+    by static exchange evaluation.
+    """
+    return all(see(position, move) <= 0 for move in position.capture_moves())
+
+
+def extract_positions(paths: "list[str]", skip_opening: int = 8,
+                      max_positions: "int | None" = None) -> TuningSet:
+    """Replays the finished games in record files and collects their quiet
+    positions, skipping the first skip_opening plies of each game. Games
+    that are unfinished or contain an illegal move are skipped. Stops after
+    max_positions positions if given.
+    """
+    codes = bytearray()
+    base = []
+    targets = []
+
+    for path in paths:
+        for result, moves in read_records(path):
+            if result not in RESULT_TARGETS:
+                continue
+
+            position = Position()
+            game_codes = bytearray()
+            game_base = []
+
+            for ply, text in enumerate(moves):
+                if ply >= skip_opening and is_quiet(position):
+                    game_codes += position_codes(position)
+                    game_base.append(structure_terms(position))
+
+                move = parse_move(text)
+
+                if move is None or not position.is_legal(move):
+                    game_codes = bytearray()
+                    game_base = []
+                    break
+
+                position.push(move)
+
+            codes += game_codes
+            base += game_base
+            targets += [RESULT_TARGETS[result]] * len(game_base)
+
+            if max_positions is not None and len(base) >= max_positions:
+                break
+
+        if max_positions is not None and len(base) >= max_positions:
+            break
+
+    count = len(base) if max_positions is None else min(len(base), max_positions)
+
+    return TuningSet(
+        np.frombuffer(bytes(codes), dtype=np.int8).reshape(-1, 64)[:count].copy(),
+        np.array(base[:count], dtype=np.float32),
+        np.array(targets[:count], dtype=np.float32)
+    )
+
+
+def position_codes(position: Position) -> bytes:
+    """Returns the 64 piece codes of a position's board."""
+    board = position.get_board()
+    codes = bytearray(64)
+
+    for row in range(8):
+        for col in range(8):
+            piece = board.get(row, col)
+
+            if piece is not None:
+                codes[row * 8 + col] = PIECE_CODES[piece.get_color(), piece.get_type()]
+
+    return bytes(codes)
+
+
+def feature_matrix(codes: np.ndarray) -> np.ndarray:
+    """Builds the dense (positions, FEATURE_COUNT) float32 feature matrix for
+    rows of piece codes. White pieces count +1 and black pieces -1; black
+    pieces use the vertically mirrored square.
+    """
+    features = np.zeros((len(codes), FEATURE_COUNT), dtype=np.float32)
+    rows, squares = np.nonzero(codes)
+    pieces = codes[rows, squares].astype(np.int64) - 1
+    white = pieces < len(PIECE_TYPES)
+    types = pieces % len(PIECE_TYPES)
+    signs = np.where(white, 1.0, -1.0).astype(np.float32)
+    squares = np.where(white, squares, squares ^ 56)
+
+    # White and black pieces of one type on mirrored squares share a column
+    np.add.at(features, (rows, types), signs)
+    np.add.at(features, (rows, MATERIAL_COLUMNS + types * 64 + squares), signs)
+
+    return features
+
+
+def weight_vector(weights: "dict | None" = None) -> np.ndarray:
+    """Returns the tunable weights (default WEIGHTS) as a feature-ordered
+    float64 vector.
+    """
+    weights = WEIGHTS if weights is None else weights
+    vector = np.zeros(FEATURE_COUNT)
+
+    for index, piece_type in enumerate(PIECE_TYPES):
+        vector[index] = weights["material"][piece_type]
+        start = MATERIAL_COLUMNS + index * 64
+        vector[start:start + 64] = weights["piece_square"][piece_type]
+
+    return vector
+
+
+def weights_dict(vector: np.ndarray) -> dict:
+    """Converts a weight vector to a complete weights dictionary in the
+    WEIGHTS format, rounded to whole centipawns. Terms that are not tuned
+    are copied from WEIGHTS.
+    """
+    vector = np.rint(vector).astype(int)
+    weights = json.loads(json.dumps(WEIGHTS))
+
+    for index, piece_type in enumerate(PIECE_TYPES):
+        weights["material"][piece_type] = int(vector[index])
+        start = MATERIAL_COLUMNS + index * 64
+        weights["piece_square"][piece_type] = vector[start:start + 64].tolist()
+
+    # The king is never traded, so its material value stays fixed
+    weights["material"]["king"] = WEIGHTS["material"]["king"]
+
+    return weights
+
+
+def _chunks(dataset: TuningSet, chunk_size: int):
+    """Yields (features, base, targets) for consecutive chunks of a set."""
+    for start in range(0, len(dataset.targets), chunk_size):
+        stop = start + chunk_size
+        yield (feature_matrix(dataset.codes[start:stop]),
+               dataset.base[start:stop], dataset.targets[start:stop])
+
+
+def loss(dataset: TuningSet, vector: np.ndarray, chunk_size: int = 4096) -> float:
+    """Returns the mean logistic loss of a weight vector's predictions."""
+    total = 0.0
+
+    for features, base, targets in _chunks(dataset, chunk_size):
+        logits = SCORE_SCALE * (base + features @ vector)
+        # log(1 + e^z) - y * z, computed stably
+        total += float(np.sum(np.logaddexp(0, logits) - targets * logits))
+
+    return total / max(len(dataset.targets), 1)
+
+
+def fit(dataset: TuningSet, vector: "np.ndarray | None" = None, epochs: int = 200,
+        learning_rate: float = 2.0, regularization: float = 1e-6,
+        chunk_size: int = 4096, on_epoch=None) -> np.ndarray:
+    """Fits material and piece-square weights to a tuning set, starting from
+    vector (default: the current WEIGHTS). Each epoch accumulates the exact
+    logistic loss gradient over the set one chunk at a time, then takes an
+    Adam step of about learning_rate centipawns per weight. Regularization
+    pulls the weights toward their starting values, so rarely seen
+    squares stay close to them. Calls on_epoch(epoch, loss) after each
+    epoch if given. Returns the fitted vector.
+    """
+    start = weight_vector() if vector is None else vector.astype(np.float64)
+    vector = start.copy()
+    moment = np.zeros(FEATURE_COUNT)
+    velocity = np.zeros(FEATURE_COUNT)
+    count = max(len(dataset.targets), 1)
+
+    for epoch in range(1, epochs + 1):
+        gradient = regularization * (vector - start)
+        total = 0.0
+
+        for features, base, targets in _chunks(dataset, chunk_size):
+            logits = SCORE_SCALE * (base + features @ vector)
+            total += float(np.sum(np.logaddexp(0, logits) - targets * logits))
+            errors = 1 / (1 + np.exp(-logits)) - targets
+            gradient += SCORE_SCALE * (features.T @ errors) / count
+
+        # The king's material value has no effect; keep it fixed
+        gradient[PIECE_TYPES.index("king")] = 0
+
+        moment = 0.9 * moment + 0.1 * gradient
+        velocity = 0.999 * velocity + 0.001 * gradient ** 2
+        step = (moment / (1 - 0.9 ** epoch)) / (np.sqrt(velocity / (1 - 0.999 ** epoch)) + 1e-12)
+        vector -= learning_rate * step
+
+        if on_epoch is not None:
+            on_epoch(epoch, total / count)
+
+    return vector
+
+
+def export_weights(vector: np.ndarray, path: str) -> dict:
+    """Writes a weight vector as a complete weights JSON file that
+    ChessEngine.load_weights() reads. Returns the weights written.
+    """
+    weights = weights_dict(vector)
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(weights, file, indent=1)
+
+    return weights
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tune evaluation weights.")
+    parser.add_argument("output")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--learning-rate", type=float, default=2.0)
+    parser.add_argument("--skip-opening", type=int, default=8)
+    args = parser.parse_args()
+
+    dataset = extract_positions(args.files, args.skip_opening)
+    print(f"{len(dataset.targets)} quiet positions")
+
+    def report(epoch: int, value: float) -> None:
+        if epoch % 10 == 0:
+            print(f"epoch {epoch}: loss {value:.5f}")
+
+    fitted = fit(dataset, epochs=args.epochs, learning_rate=args.learning_rate,
+                 chunk_size=args.chunk_size, on_epoch=report)
+    export_weights(fitted, args.output)
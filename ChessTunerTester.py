@@ -0,0 +1,149 @@
+import copy
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+import ChessEngine
+from ChessEngine import (Position, WEIGHTS, evaluate, format_move, format_record,
+                         load_weights)
+from ChessTuner import (FEATURE_COUNT, TuningSet, extract_positions, export_weights,
+                        feature_matrix, fit, is_quiet, loss, position_codes,
+                        weight_vector)
+
+
+def random_games(count, seed, plies=60):
+    """Returns (result, moves) records of random games."""
+    rng = random.Random(seed)
+    records = []
+
+    for _ in range(count):
+        position = Position()
+        moves = []
+
+        while position.get_winner() is None and len(moves) < plies:
+            move = rng.choice(position.legal_moves())
+            moves.append(format_move(move))
+            position.push(move)
+
+        state = position.get_game_state()
+        records.append((state if state != "UNFINISHED" else "DRAW", moves))
+
+    return records
+
+
+class TestTuner(unittest.TestCase):
+    """Tests the evaluation tuning pipeline."""
+    def setUp(self):
+        self.saved = copy.deepcopy(WEIGHTS)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        WEIGHTS.clear()
+        WEIGHTS.update(self.saved)
+        self.directory.cleanup()
+
+    def write_records(self, records, extra=()):
+        """Writes records (and extra raw lines) to a file; returns its path."""
+        path = os.path.join(self.directory.name, "games.txt")
+
+        with open(path, "w", encoding="utf-8") as file:
+            for result, moves in records:
+                file.write(format_record(result, moves) + "\n")
+            for line in extra:
+                file.write(line + "\n")
+
+        return path
+
+    def test_features_match_evaluation(self):
+        """Tests that features times weights plus base is the evaluation."""
+        path = self.write_records(random_games(4, 40))
+        dataset = extract_positions([path], skip_opening=0)
+        scores = dataset.base + feature_matrix(dataset.codes) @ weight_vector()
+
+        rng = random.Random(40)
+        position = Position()
+
+        while position.get_winner() is None and position.get_ply() < 60:
+            codes = np.frombuffer(position_codes(position), dtype=np.int8)[None]
+            expected = evaluate(position) * (1 if position.get_color() == "white" else -1)
+            score = feature_matrix(codes) @ weight_vector()
+            self.assertEqual(score[0] + ChessEngine.structure_terms(position), expected)
+            position.push(rng.choice(position.legal_moves()))
+
+        self.assertEqual(dataset.codes.shape, (len(dataset.targets), 64))
+        self.assertTrue(np.all(np.abs(scores) < 5000))
+
+    def test_extraction(self):
+        """Tests that only quiet positions of finished games are kept."""
+        records = random_games(3, 41)
+        path = self.write_records(records, ["UNFINISHED e2e4 e7e5",
+                                            "WHITE_WON e2e4 e2e4"])
+        dataset = extract_positions([path], skip_opening=4)
+
+        expected = 0
+        for result, moves in records:
+            position = Position()
+            for ply, text in enumerate(moves):
+                expected += ply >= 4 and is_quiet(position)
+                position.push(ChessEngine.parse_move(text))
+
+        self.assertEqual(len(dataset.targets), expected)
+        self.assertEqual(len(extract_positions([path], 4, max_positions=5).targets), 5)
+
+    def test_fit(self):
+        """Tests that fitting recovers a hidden evaluation."""
+        # Label positions with the win probabilities of a hidden evaluation in
+        # which pawns are worth three times what WEIGHTS says
+        path = self.write_records(random_games(20, 42))
+        dataset = extract_positions([path], skip_opening=0)
+        hidden = weight_vector()
+        hidden[5] = 300
+        logits = (dataset.base + feature_matrix(dataset.codes) @ hidden) * np.log(10) / 400
+        targets = (1 / (1 + np.exp(-logits))).astype(np.float32)
+        dataset = TuningSet(dataset.codes, dataset.base, targets)
+
+        fitted = fit(dataset, epochs=150, learning_rate=5.0, chunk_size=64)
+
+        # The hidden weights reach the lowest possible loss; fitting closes
+        # most of the gap from the starting weights
+        start = loss(dataset, weight_vector())
+        best = loss(dataset, hidden)
+        self.assertLess(loss(dataset, fitted) - best, (start - best) / 4)
+        self.assertEqual(fitted[0], WEIGHTS["material"]["king"])
+
+        # Chunking does not change the result
+        whole = fit(dataset, epochs=5, chunk_size=len(targets))
+        chunked = fit(dataset, epochs=5, chunk_size=7)
+        np.testing.assert_allclose(whole, chunked, atol=1e-6)
+
+    def test_export_and_load(self):
+        """Tests that exported weights load into the engine."""
+        vector = weight_vector()
+        vector[4] = 345.4
+        vector[FEATURE_COUNT - 1] = -12.6
+        path = os.path.join(self.directory.name, "weights.json")
+
+        export_weights(vector, path)
+        load_weights(path)
+
+        self.assertEqual(WEIGHTS["material"]["knight"], 345)
+        self.assertEqual(WEIGHTS["piece_square"]["hunter"][63], -13)
+        self.assertEqual(WEIGHTS["reserve"], self.saved["reserve"])
+
+        for bad in ({"material": {"wizard": 5}}, {"reserve": [1]},
+                    {"piece_square": {"pawn": [0] * 10}}, []):
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(bad, file)
+
+            with self.assertRaises(ValueError):
+                load_weights(path)
+
+        self.assertEqual(WEIGHTS["material"]["knight"], 345)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,13 +7,56 @@
 #                   contain properties and methods for managing game state,
 #                   validating moves, and actioning pieces on the board.
 
+import random
+import sys
+from typing import NamedTuple
+
+
+def _zobrist_keys() -> dict:
+    """Generates the fixed 64-bit Zobrist keys used to hash positions: one per
+    piece type/color/square, plus keys for side to move, fairy pieces held in
+    reserve, and fairy points (capped at 2, the most the entry rules use).
+    """
+    rng = random.Random(20240302)
+    types = ("king", "queen", "rook", "bishop", "knight", "pawn", "falcon", "hunter")
+
+    return {
+        "piece": {
+            (color, piece_type): [rng.getrandbits(64) for _ in range(64)]
+            for color in ("white", "black") for piece_type in types
+        },
+        "black": rng.getrandbits(64),
+        "reserve": {
+            (color, fairy): rng.getrandbits(64)
+            for color in ("white", "black") for fairy in ("falcon", "hunter")
+        },
+        "points": {
+            (color, points): rng.getrandbits(64)
+            for color in ("white", "black") for points in range(3)
+        }
+    }
+
+
+ZOBRIST = _zobrist_keys()
+
 
 class ChessVar:
     """Represents a game of chess comprising two players, a board, and all the
     standard chess pieces plus the falcon and hunter. Handles user input, game
     state and flow, and player move validation.
+
+    Draw adjudication is optional and off by default. The game is drawn when
+    the same position (pieces, side to move, reserves, and fairy points)
+    occurs repetition_limit times, when no_capture_limit moves in a row
+    capture nothing, or when ply_limit moves have been played in total.
+
+    Every move and fairy entry is recorded in a GameHistory that keeps a
+    full snapshot every snapshot_interval plies (see get_history()).
     """
-    def __init__(self) -> None:
+    def __init__(self, repetition_limit: "int | None" = None,
+                 no_capture_limit: "int | None" = None,
+                 ply_limit: "int | None" = None,
+                 snapshot_interval: int = 16) -> None:
         self._white = Player("white")
         self._black = Player("black")
 
@@ -21,6 +64,16 @@ class ChessVar:
         self._winner = None
         self._board = Board()
 
+        self._repetition_limit = repetition_limit
+        self._no_capture_limit = no_capture_limit
+        self._ply_limit = ply_limit
+        self._draw = None
+        self._ply = 0
+        self._quiet_plies = 0
+        self._positions = {self._get_hash(): 1}
+        self._history = GameHistory(self._board, self._white, self._black,
+                                    snapshot_interval)
+
         print("\nGame start!")
         self.print_board()
         print("\nWhite's turn")
@@ -35,6 +88,10 @@ class ChessVar:
         """Returns the player for the current turn."""
         return self._player
 
+    def get_history(self) -> "GameHistory":
+        """Returns the history of the moves played so far."""
+        return self._history
+
     def get_game_state(self) -> str:
         """Returns a string declaring the game's current win state."""
         if self._winner is self._white:
@@ -43,6 +100,9 @@ class ChessVar:
         if self._winner is self._black:
             return "BLACK_WON"
 
+        if self._draw is not None:
+            return "DRAW"
+
         return "UNFINISHED"
 
     def make_move(self, orig: str, dest: str) -> bool:
@@ -64,6 +124,10 @@ class ChessVar:
             print("\nInvalid move; game already won")
             return False
 
+        if self._draw is not None:
+            print("\nInvalid move; game already drawn")
+            return False
+
         # Validate coordinates
         orig_coords = self._to_coordinates(orig)
         dest_coords = self._to_coordinates(dest)
@@ -84,9 +148,7 @@ class ChessVar:
             return False
 
         # Validate target space is a valid move
-        valid_moves = self._board.get_valid_moves(*orig_coords)
-
-        if dest_coords not in valid_moves:
+        if not self._board.is_valid_move(*orig_coords, *dest_coords):
             print("\nInvalid move; destination not allowed")
             return False
 
@@ -106,13 +168,28 @@ class ChessVar:
                 self._change_turn()
                 if captured_type in {"queen", "rook", "bishop", "knight"}:
                     self._player.increment_fairy_points()
+
+                    points = self._player.get_fairy_points()
+                    print(f"{enemy} has {points} fairy point{'s' if points > 1 else ''}")
         else:
             self._change_turn()
 
+        self._history.record(
+            orig + dest,
+            [(orig_coords[0] * 8 + orig_coords[1], piece, None),
+             (dest_coords[0] * 8 + dest_coords[1], captured, piece)],
+            self._board, self._player.get_color()
+        )
+
+        if self._winner is None:
+            self._adjudicate(captured is not None)
+
         self.print_board()
 
         if self._winner is not None:
             print(f"\n{player.get_color().capitalize()} wins!\n")
+        elif self._draw is not None:
+            print(f"\nDraw by {self._draw}\n")
         else:
             print(f"\n{self._player.get_color().capitalize()}'s turn")
 
@@ -131,61 +208,114 @@ class ChessVar:
 
         print(f"\n> {color.capitalize()} plays {fairy} to {pos}")
 
+        error = self._check_fairy_entry(token, pos)
+
+        if error is not None:
+            print(f"\n{error}")
+            return False
+
+        pos_coords = self._to_coordinates(pos)
+
+        # Execute move
+        entered = ChessPiece(fairy, player.get_color())
+        self._board.set(*pos_coords, entered)
+        player.remove_from_reserve(fairy)
+
+        print(f"\n{color.capitalize()}'s {fairy} is now in play")
+        self.print_board()
+
+        self._change_turn()
+        self._history.record(f"{token.upper()}@{pos}",
+                             [(pos_coords[0] * 8 + pos_coords[1], None, entered)],
+                             self._board, self._player.get_color())
+        self._adjudicate(False)
+
+        if self._draw is not None:
+            print(f"\nDraw by {self._draw}\n")
+        else:
+            print(f"\n{self._player.get_color().capitalize()}'s turn")
+
+        return True
+
+    def _check_fairy_entry(self, token: str, pos: str) -> "str | None":
+        """Takes a fairy piece and target position in lowercase algebraic
+        notation and returns why enter_fairy_piece() would reject the play,
+        or None if it is valid. Changes nothing and prints nothing.
+        """
+        player = self._player
+        color = player.get_color()
+        fairy = "falcon" if token.lower() == "f" else "hunter"
+
         # Validate game status
         if self._winner is not None:
-            print("\nInvalid play; game already won")
-            return False
+            return "Invalid play; game already won"
+
+        if self._draw is not None:
+            return "Invalid play; game already drawn"
 
         if token not in ("F", "H", "f", "h"):
-            print("\nInvalid input")
-            return False
+            return "Invalid input"
 
         # Validate selected piece matches player color
         if (player is self._white and token.islower()
             or player is self._black and token.isupper()
         ):
-            print("\nInvalid play; fairy piece is enemy color")
-            return False
+            return "Invalid play; fairy piece is enemy color"
 
         # Validate position is on the board
         pos_coords = self._to_coordinates(pos)
 
         if pos_coords is None:
-            print("\nInvalid input; position not on board")
-            return False
+            return "Invalid input; position not on board"
 
         reserve = player.get_reserve()
         points = player.get_fairy_points()
 
         # Validate fairy in reserve
         if fairy not in reserve:
-            print(f"\nInvalid play; {color} {fairy} already played")
-            return False
+            return f"Invalid play; {color} {fairy} already played"
 
         # If two left, must have 1 point; if 1 left, must have 2 points
         if len(reserve) == 2 and points < 1 or len(reserve) == 1 and points < 2:
-            print("\nInvalid play; not enough fairy points")
-            return False
+            return "Invalid play; not enough fairy points"
 
         # Validate target space is a valid move
         if (player is self._white and not 6 <= pos_coords[0] <= 7
             or player is self._black and not 0 <= pos_coords[0] <= 1
             or self._board.get(*pos_coords) is not None
         ):
-            print("\nInvalid starting space")
-            return False
+            return "Invalid starting space"
 
-        # Else, execute move
-        self._board.set(*pos_coords, ChessPiece(fairy, player.get_color()))
-        player.remove_from_reserve(fairy)
+        return None
 
-        print(f"\n{color.capitalize()}'s {fairy} is now in play")
-        self.print_board()
+    def _get_hash(self) -> int:
+        """Returns the Zobrist hash of the position: pieces on the board, side
+        to move, and each player's reserve and fairy points.
+        """
+        key = self._board.get_hash() ^ self._white.get_hash() ^ self._black.get_hash()
 
-        self._change_turn()
-        print(f"\n{self._player.get_color().capitalize()}'s turn")
+        return key ^ ZOBRIST["black"] if self._player is self._black else key
 
-        return True
+    def _adjudicate(self, capture: bool) -> None:
+        """Records the position reached by a completed turn and declares a
+        draw if any enabled draw rule now applies.
+        """
+        self._ply += 1
+        self._quiet_plies = 0 if capture else self._quiet_plies + 1
+
+        key = self._get_hash()
+        self._positions[key] = self._positions.get(key, 0) + 1
+
+        if (self._repetition_limit is not None
+            and self._positions[key] >= self._repetition_limit
+        ):
+            self._draw = "repetition"
+        elif (self._no_capture_limit is not None
+              and self._quiet_plies >= self._no_capture_limit
+        ):
+            self._draw = "move limit"
+        elif self._ply_limit is not None and self._ply >= self._ply_limit:
+            self._draw = "ply limit"
 
     def _change_turn(self) -> None:
         """Changes which player has the current turn."""
@@ -235,13 +365,31 @@ class Player:
         if fairy in self._reserve:
             self._reserve.remove(fairy)
 
+    def add_to_reserve(self, fairy: str) -> None:
+        """Returns the specified fairy piece to the player's reserve, keeping
+        the falcon ahead of the hunter.
+        """
+        if fairy not in self._reserve:
+            self._reserve.append(fairy)
+            self._reserve.sort(key=("falcon", "hunter").index)
+
     def increment_fairy_points(self) -> None:
         """Increments the player's fairy points."""
         self._fairy_points += 1
 
-        color = self.get_color().capitalize()
-        points = self.get_fairy_points()
-        print(f"{color} has {points} fairy point{'s' if points > 1 else ''}")
+    def decrement_fairy_points(self) -> None:
+        """Decrements the player's fairy points."""
+        self._fairy_points -= 1
+
+    def get_hash(self) -> int:
+        """Returns the Zobrist key for the player's reserve and fairy points."""
+        color = self.get_color()
+        key = ZOBRIST["points"][color, min(self._fairy_points, 2)]
+
+        for fairy in self._reserve:
+            key ^= ZOBRIST["reserve"][color, fairy]
+
+        return key
 
     def print_sideboard(self) -> None:
         """Prints the player's remaining pieces in reserve and fairy points."""
@@ -281,6 +429,23 @@ class Board:
             }
         }
 
+        # Attack maps: squares each occupied square attacks (with the color
+        # they were recorded for), the origins attacking each square, and a
+        # per-color count of attackers on every square
+        self._targets = [[None] * 8 for _ in range(8)]
+        self._attackers = [[set() for _ in range(8)] for _ in range(8)]
+        self._attack_counts = {
+            "white": [[0] * 8 for _ in range(8)],
+            "black": [[0] * 8 for _ in range(8)]
+        }
+        self._rebuild_attacks()
+
+        # Zobrist hashes of all pieces and of pawns alone, updated by set()
+        self._hash, self._pawn_hash = self._compute_hashes()
+
+        # Callables told of every change made by set()
+        self._listeners = []
+
     def print(self) -> None:
         """Prints a graphical representation of the current board state."""
         print("\n      ╔═══╤═══╤═══╤═══╤═══╤═══╤═══╤═══╗")
@@ -309,10 +474,176 @@ class Board:
         that position. Returns the captured ChessPiece object (if any).
         """
         captured = self._grid[row][col]
+
+        for changed in (captured, piece):
+            if changed is not None:
+                key = ZOBRIST["piece"][changed.get_color(), changed.get_type()][row*8 + col]
+                self._hash ^= key
+
+                if changed.get_type() == "pawn":
+                    self._pawn_hash ^= key
+
+        # The piece on this square and every piece whose line runs through it
+        # attack differently once the square changes; refresh only those
+        affected = self._attackers[row][col] | {(row, col)}
+
+        for r, c in affected:
+            self._remove_attacks(r, c)
+
         self._grid[row][col] = piece
 
+        for r, c in affected:
+            self._add_attacks(r, c)
+
+        for listener in self._listeners:
+            listener(row, col, captured, piece)
+
         return captured
 
+    def add_listener(self, listener) -> None:
+        """Registers a callable to be called as listener(row, col, old, new)
+        after every set(), with the pieces (or None) before and after.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """Unregisters a callable added with add_listener()."""
+        self._listeners.remove(listener)
+
+    def get_hash(self) -> int:
+        """Returns the Zobrist hash of the pieces on the board."""
+        return self._hash
+
+    def get_pawn_hash(self) -> int:
+        """Returns the Zobrist hash of the pawns on the board."""
+        return self._pawn_hash
+
+    def _compute_hashes(self) -> "tuple[int, int]":
+        """Computes the Zobrist hashes of all pieces and of pawns alone for
+        the current grid from scratch.
+        """
+        key = pawn_key = 0
+
+        for row in range(8):
+            for col in range(8):
+                piece = self._grid[row][col]
+
+                if piece is not None:
+                    piece_key = ZOBRIST["piece"][piece.get_color(), piece.get_type()][row*8 + col]
+                    key ^= piece_key
+
+                    if piece.get_type() == "pawn":
+                        pawn_key ^= piece_key
+
+        return key, pawn_key
+
+    def attackers_of(self, row: int, col: int, color: str) -> "set[tuple[int, int]]":
+        """Takes a row/col and a color and returns the set of positions (as
+        row/col coordinates) of that color's pieces attacking the square.
+        """
+        return {
+            (r, c) for r, c in self._attackers[row][col]
+            if self._targets[r][c][0] == color
+        }
+
+    def is_attacked(self, row: int, col: int, color: str) -> bool:
+        """Takes a row/col and a color and returns whether any of that color's
+        pieces attack the square.
+        """
+        return self._attack_counts[color][row][col] > 0
+
+    def get_attack_count(self, row: int, col: int, color: str) -> int:
+        """Takes a row/col and a color and returns the number of that color's
+        pieces attacking the square.
+        """
+        return self._attack_counts[color][row][col]
+
+    def get_attacks(self, row: int, col: int) -> "set[tuple[int, int]]":
+        """Takes a row/col and returns the set of squares (as row/col
+        coordinates) attacked by the piece in that position. Unlike
+        get_valid_moves(), a square is attacked whether it is empty or holds a
+        piece of either color, and pawns attack only their diagonals.
+        """
+        attacks = set()
+        piece = self.get(row, col)
+
+        if piece is None:
+            return attacks
+
+        moveset = piece.get_moveset()
+
+        if piece.get_type() == "pawn":
+            for dy, dx in moveset[1:]:
+                if 0 <= row+dy <= 7 and 0 <= col+dx <= 7:
+                    attacks.add((row+dy, col+dx))
+
+            return attacks
+
+        step_limit = piece.get_step_limit()
+
+        for dy, dx in moveset:
+            r, c, steps = row + dy, col + dx, step_limit
+
+            while steps != 0 and 0 <= r <= 7 and 0 <= c <= 7:
+                attacks.add((r, c))
+
+                if self._grid[r][c] is not None:
+                    break
+
+                if steps is not None:
+                    steps -= 1
+
+                r, c = r + dy, c + dx
+
+        return attacks
+
+    def _add_attacks(self, row: int, col: int) -> None:
+        """Records the attacks of the piece at row/col (if any) in the attack
+        maps.
+        """
+        piece = self._grid[row][col]
+
+        if piece is None:
+            return
+
+        color = piece.get_color()
+        targets = self.get_attacks(row, col)
+        counts = self._attack_counts[color]
+
+        self._targets[row][col] = (color, targets)
+
+        for r, c in targets:
+            self._attackers[r][c].add((row, col))
+            counts[r][c] += 1
+
+    def _remove_attacks(self, row: int, col: int) -> None:
+        """Removes the attacks recorded for row/col (if any) from the attack
+        maps.
+        """
+        recorded = self._targets[row][col]
+
+        if recorded is None:
+            return
+
+        color, targets = recorded
+        counts = self._attack_counts[color]
+
+        for r, c in targets:
+            self._attackers[r][c].discard((row, col))
+            counts[r][c] -= 1
+
+        self._targets[row][col] = None
+
+    def _rebuild_attacks(self) -> None:
+        """Recomputes the attack maps from scratch for the current grid."""
+        for row in range(8):
+            for col in range(8):
+                self._remove_attacks(row, col)
+
+        for row in range(8):
+            for col in range(8):
+                self._add_attacks(row, col)
+
     def _scan(self, row: int, col: int, dy: int, dx: int, step_limit: int,
               color: str, can_capture=True, res: "set[tuple[int, int]]"=None
         ) -> "set[tuple[int, int]]":
@@ -354,6 +685,59 @@ class Board:
 
         return self._scan(row+dy, col+dx, dy, dx, step_limit, color, can_capture, res)
 
+    def is_valid_move(self, row: int, col: int, dest_row: int, dest_col: int) -> bool:
+        """Takes an origin and destination row/col and returns whether the
+        piece at the origin may move there. Gives the same answer as checking
+        membership in get_valid_moves(), but only examines the squares between
+        origin and destination.
+        """
+        piece = self.get(row, col)
+
+        if piece is None or not 0 <= dest_row <= 7 or not 0 <= dest_col <= 7:
+            return False
+
+        color = piece.get_color()
+        target = self._grid[dest_row][dest_col]
+
+        if target is not None and target.get_color() == color:
+            return False
+
+        moveset = piece.get_moveset()
+        dr, dc = dest_row - row, dest_col - col
+
+        if piece.get_type() == "pawn":
+            dy = moveset[0][0]
+
+            # Diagonal move only if enemy present
+            if (dr, dc) in moveset[1:]:
+                return target is not None
+
+            # Vertical move never captures; two steps only from a home row
+            if dc != 0 or target is not None:
+                return False
+
+            return (dr == dy
+                    or dr == 2 * dy and row in (1, 6)
+                    and self._grid[row+dy][col] is None)
+
+        step_limit = piece.get_step_limit()
+
+        for dy, dx in moveset:
+            # Find how many steps along this direction reach the destination
+            steps = dr // dy if dy else dc // dx
+
+            if steps < 1 or (dy * steps, dx * steps) != (dr, dc):
+                continue
+
+            if step_limit is not None and steps > step_limit:
+                continue
+
+            # Every square before the destination must be empty
+            return all(self._grid[row + dy*i][col + dx*i] is None
+                       for i in range(1, steps))
+
+        return False
+
     def get_valid_moves(self, row: int, col: int) -> "set[tuple[int, int]]":
         """Takes a row/col coordinate pair and calculates and returns a set of
         valid moves (as row/col coordinates) for the piece in that position.
@@ -463,7 +847,175 @@ class ChessPiece:
         return self._step_limit
 
 
+class HistoryState(NamedTuple):
+    """A position recovered from a GameHistory: the 64 squares (row * 8 +
+    col, a8 first) holding ChessPiece objects or None, each color's reserve
+    and fairy points, and the color whose turn it is.
+    """
+    squares: "tuple[ChessPiece | None, ...]"
+    reserves: "dict[str, tuple[str, ...]]"
+    points: "dict[str, int]"
+    turn: str
+
+    def get(self, row: int, col: int) -> "ChessPiece | None":
+        """Returns the piece at the specified coordinates."""
+        return self.squares[row * 8 + col]
+
+
+class GameHistory:
+    """Records a game ply by ply for fast random access. Each ply is stored
+    as a compact delta: its move text, the squares it changed (with the
+    pieces before and after), any reserve or fairy point changes, and the
+    color to move afterward. A full snapshot of the board is kept every
+    snapshot_interval plies.
+
+    seek() starts from whichever is closer, the last position sought or the
+    nearest earlier snapshot, and applies only the deltas in between, so
+    stepping through a game costs one delta per ply and any jump costs at
+    most snapshot_interval deltas. ChessPiece objects are shared, not copied.
+    """
+    def __init__(self, board: "Board", white: "Player", black: "Player",
+                 snapshot_interval: int = 16) -> None:
+        self._players = {"white": white, "black": black}
+        self._interval = snapshot_interval
+        self._deltas = []
+
+        squares = [board.get(row, col) for row in range(8) for col in range(8)]
+        sideboards = self._sideboards()
+        self._sideboard = sideboards
+        self._snapshots = [(tuple(squares), sideboards, "white")]
+
+        # Cursor: the last position sought, updated in place
+        self._cursor = 0
+        self._squares = squares
+        self._cursor_sideboards = sideboards
+        self._turn = "white"
+
+    def get_length(self) -> int:
+        """Returns the number of plies recorded."""
+        return len(self._deltas)
+
+    def get_move(self, ply: int) -> str:
+        """Returns the text of the move played at a ply (counting from 0):
+        "e2e4", or "F@e2" and "H@e2" for fairy entries.
+        """
+        return self._deltas[ply][0]
+
+    def get_delta(self, ply: int) -> tuple:
+        """Returns the delta recorded for a ply (counting from 0): the move
+        text, the (square, before, after) board changes, the (before, after)
+        color -> (reserve, fairy points) sideboards if they changed or None,
+        and the color to move afterward.
+        """
+        return self._deltas[ply]
+
+    def record(self, move: str, changes: "list[tuple[int, ChessPiece | None, ChessPiece | None]]",
+               board: "Board", turn: str) -> None:
+        """Records a ply after it has been played. Takes the move text, the
+        (square, before, after) changes it made to the board, the board
+        itself, and the color now to move.
+        """
+        sideboards = self._sideboards()
+        sideboard_change = None
+
+        if sideboards != self._sideboard:
+            sideboard_change = (self._sideboard, sideboards)
+            self._sideboard = sideboards
+
+        self._deltas.append((move, tuple(changes), sideboard_change, turn))
+
+        if len(self._deltas) % self._interval == 0:
+            squares = tuple(board.get(row, col) for row in range(8) for col in range(8))
+            self._snapshots.append((squares, sideboards, turn))
+
+    def seek(self, ply: int) -> HistoryState:
+        """Returns the position after the given number of plies (0 is the
+        start of the game). Raises IndexError if ply is out of range.
+        """
+        if not 0 <= ply <= len(self._deltas):
+            raise IndexError(f"ply {ply} not in history")
+
+        index = ply // self._interval
+
+        if ply - index * self._interval < abs(ply - self._cursor):
+            squares, sideboards, turn = self._snapshots[index]
+            self._squares = list(squares)
+            self._cursor_sideboards = sideboards
+            self._turn = turn
+            self._cursor = index * self._interval
+
+        squares = self._squares
+
+        while self._cursor < ply:
+            _, changes, sideboard_change, turn = self._deltas[self._cursor]
+
+            for square, _, after in changes:
+                squares[square] = after
+
+            if sideboard_change is not None:
+                self._cursor_sideboards = sideboard_change[1]
+
+            self._turn = turn
+            self._cursor += 1
+
+        while self._cursor > ply:
+            self._cursor -= 1
+            _, changes, sideboard_change, _ = self._deltas[self._cursor]
+
+            for square, before, _ in reversed(changes):
+                squares[square] = before
+
+            if sideboard_change is not None:
+                self._cursor_sideboards = sideboard_change[0]
+
+            self._turn = self._deltas[self._cursor - 1][3] if self._cursor else "white"
+
+        sideboards = self._cursor_sideboards
+
+        return HistoryState(
+            tuple(squares),
+            {color: sideboards[color][0] for color in sideboards},
+            {color: sideboards[color][1] for color in sideboards},
+            self._turn
+        )
+
+    def _sideboards(self) -> "dict[str, tuple[tuple[str, ...], int]]":
+        """Returns each player's current (reserve, fairy points)."""
+        return {
+            color: (tuple(player.get_reserve()), player.get_fairy_points())
+            for color, player in self._players.items()
+        }
+
+
 if __name__ == "__main__":
+    # Engine mode: "python ChessVar.py --engine white|black [seconds per move]"
+    usage = "Usage: python ChessVar.py [--engine white|black [seconds per move]]"
+    engine_color = None
+    movetime = 3.0
+
+    if len(sys.argv) > 1:
+        if sys.argv[1] != "--engine" or not 3 <= len(sys.argv) <= 4:
+            print(usage)
+            sys.exit(2)
+
+        engine_color = sys.argv[2].lower()
+
+        if engine_color not in ("white", "black"):
+            print(f"Engine color must be white or black, not {sys.argv[2]!r}")
+            print(usage)
+            sys.exit(2)
+
+        if len(sys.argv) == 4:
+            try:
+                movetime = float(sys.argv[3])
+            except ValueError:
+                movetime = 0.0
+
+            if not movetime > 0:
+                print(f"Seconds per move must be a positive number, not {sys.argv[3]!r}")
+                print(usage)
+                sys.exit(2)
+
     print("\n" * 20)
     print(
         r"   _____ _                __      __            " + "\n"
@@ -496,18 +1048,59 @@ if __name__ == "__main__":
         r"> Destination: d2                               "
     )
 
+    if engine_color is not None:
+        from ChessEngine import Position, Ponderer, format_move, parse_move
+
+        position = Position()
+        ponderer = Ponderer()
+
     game = ChessVar()
 
     # MAIN LOOP
     while game.get_game_state() == "UNFINISHED":
+        color = game.get_current_player().get_color()
+
+        if color == engine_color:
+            # Reuse the pondered search if the human played the expected move
+            result = ponderer.resolve(position.get_last_move(), movetime)
+            if result is None or result.move is None:
+                result = ponderer.get_searcher().search(position, movetime=movetime)
+            if result.move is None:
+                print(f"\n{color.capitalize()} engine has no move; game over")
+                break
+
+            move = format_move(result.move)
+
+            if "@" in move:
+                game.enter_fairy_piece(move[0] if color == "white" else move[0].lower(),
+                                       move[2:])
+            else:
+                game.make_move(move[:2], move[2:])
+
+            position.push(result.move)
+
+            # Think about the expected reply while the human does
+            if len(result.pv) > 1 and position.is_legal(result.pv[1]):
+                ponderer.start(position, result.pv[1])
+
+            continue
+
         origin = input("\n> Origin: ")
         destination = input("> Destination: ")
 
         if origin == "falcon":
-            origin = "F" if game.get_current_player().get_color() == "white" else "f"
-            game.enter_fairy_piece(origin, destination)
+            origin = "F" if color == "white" else "f"
+            played = game.enter_fairy_piece(origin, destination)
         elif origin == "hunter":
-            origin = "H" if game.get_current_player().get_color() == "white" else "h"
-            game.enter_fairy_piece(origin, destination)
+            origin = "H" if color == "white" else "h"
+            played = game.enter_fairy_piece(origin, destination)
         else:
-            game.make_move(origin, destination)
+            played = game.make_move(origin, destination)
+
+        if engine_color is not None and played:
+            if origin in ("F", "f", "H", "h"):
+                move = parse_move(f"{origin}@{destination.lower()}")
+            else:
+                move = parse_move(f"{origin}{destination}".lower())
+
+            position.push(move)
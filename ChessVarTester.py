@@ -1,5 +1,8 @@
+import contextlib
+import io
+import random
 import unittest
-from ChessVar import ChessVar, ChessPiece
+from ChessVar import ChessVar, ChessPiece, Board
 
 
 class TestGradescope(unittest.TestCase):
@@ -502,6 +505,312 @@ class TestEnterFairyPieces(unittest.TestCase):
         self.assertFalse(game.make_move("H", "f2"))
 
 
+class TestAttackMaps(unittest.TestCase):
+    """Tests incrementally maintained attack maps."""
+    def assertMapsMatchRebuild(self, board):
+        """Asserts the incremental maps equal maps rebuilt from scratch."""
+        fresh = Board()
+        fresh._grid = [row[:] for row in board._grid]
+        fresh._rebuild_attacks()
+
+        for row in range(8):
+            for col in range(8):
+                for color in ("white", "black"):
+                    self.assertEqual(board.attackers_of(row, col, color),
+                                     fresh.attackers_of(row, col, color))
+                    self.assertEqual(board.get_attack_count(row, col, color),
+                                     fresh.get_attack_count(row, col, color))
+
+    def test_starting_position(self):
+        """Tests attacks in the starting position."""
+        board = Board()
+
+        # f3 is covered by the e2/g2 pawns and the g1 knight
+        self.assertEqual(board.attackers_of(5, 5, "white"), {(6, 4), (6, 6), (7, 6)})
+        self.assertTrue(board.is_attacked(5, 5, "white"))
+        self.assertFalse(board.is_attacked(5, 5, "black"))
+
+        # Pawns do not attack straight ahead; back rank rooks are blocked
+        self.assertFalse(board.is_attacked(3, 0, "white"))
+        self.assertEqual(board.attackers_of(6, 0, "white"), {(7, 0)})
+
+    def test_incremental_updates(self):
+        """Tests attack maps after moves, captures, and fairy entry."""
+        game = ChessVar()
+        board = game._board
+
+        for orig, dest in (("e2", "e4"), ("d7", "d5"), ("d1", "g4"),
+                           ("c8", "g4"), ("f1", "b5"), ("c7", "c6")):
+            self.assertTrue(game.make_move(orig, dest))
+            self.assertMapsMatchRebuild(board)
+
+        self.assertTrue(game.enter_fairy_piece("H", "d1"))
+        self.assertMapsMatchRebuild(board)
+
+        # The white hunter on d1 defends the d2 pawn but sees no further
+        self.assertIn((7, 3), board.attackers_of(6, 3, "white"))
+        self.assertNotIn((7, 3), board.attackers_of(5, 3, "white"))
+
+        # Black's bishop on g4 attacks the hunter
+        self.assertIn((4, 6), board.attackers_of(7, 3, "black"))
+        self.assertTrue(board.is_attacked(7, 3, "black"))
+
+
+class TestBoardListeners(unittest.TestCase):
+    """Tests Board change listeners."""
+    def test_listeners(self):
+        """Tests that listeners see every change until removed."""
+        board = Board()
+        changes = []
+
+        def listener(*change):
+            changes.append(change)
+
+        board.add_listener(listener)
+
+        pawn = board.get(6, 4)
+        board.set(4, 4, pawn)
+        board.set(6, 4, None)
+        self.assertEqual(changes, [(4, 4, None, pawn), (6, 4, pawn, None)])
+
+        board.remove_listener(listener)
+        board.set(6, 4, pawn)
+        self.assertEqual(len(changes), 2)
+
+
+class TestMoveLegality(unittest.TestCase):
+    """Tests single-move legality checks against get_valid_moves()."""
+    def assertAgreesWithValidMoves(self, board):
+        """Asserts is_valid_move() matches get_valid_moves() for every origin
+        and destination, including destinations off the board.
+        """
+        for row in range(8):
+            for col in range(8):
+                valid_moves = board.get_valid_moves(row, col)
+
+                for dest_row in range(-1, 9):
+                    for dest_col in range(-1, 9):
+                        self.assertEqual(
+                            board.is_valid_move(row, col, dest_row, dest_col),
+                            (dest_row, dest_col) in valid_moves,
+                            (row, col, dest_row, dest_col)
+                        )
+
+    def test_random_games(self):
+        """Tests positions reached by random play with fairy pieces mixed in."""
+        rng = random.Random(28)
+
+        for _ in range(4):
+            board = Board()
+            color = "white"
+
+            for ply in range(60):
+                if ply % 15 == 7:
+                    empty = [(row, col) for row in range(8) for col in range(8)
+                             if board.get(row, col) is None]
+                    fairy = rng.choice(("falcon", "hunter"))
+                    board.set(*rng.choice(empty), ChessPiece(fairy, color))
+
+                self.assertAgreesWithValidMoves(board)
+
+                moves = [((row, col), dest) for row in range(8) for col in range(8)
+                         if board.get(row, col) is not None
+                         and board.get(row, col).get_color() == color
+                         for dest in board.get_valid_moves(row, col)]
+
+                if not moves:
+                    break
+
+                orig, dest = rng.choice(moves)
+                board.set(*dest, board.get(*orig))
+                board.set(*orig, None)
+                color = "black" if color == "white" else "white"
+
+    def test_pawn_double_step(self):
+        """Tests pawn double steps are blocked by a piece on either square."""
+        board = Board()
+
+        self.assertTrue(board.is_valid_move(6, 4, 4, 4))
+        board.set(5, 4, ChessPiece("knight", "black"))
+        self.assertFalse(board.is_valid_move(6, 4, 4, 4))
+        self.assertFalse(board.is_valid_move(6, 4, 5, 4))
+
+        board.set(5, 4, None)
+        board.set(4, 4, ChessPiece("knight", "black"))
+        self.assertFalse(board.is_valid_move(6, 4, 4, 4))
+        self.assertTrue(board.is_valid_move(6, 4, 5, 4))
+
+
+class TestDrawAdjudication(unittest.TestCase):
+    """Tests optional draw adjudication."""
+    def shuffle_knights(self, game, times):
+        """Moves both kingside knights out and back times times."""
+        for _ in range(times):
+            for orig, dest in (("g1", "f3"), ("g8", "f6"), ("f3", "g1"), ("f6", "g8")):
+                self.assertTrue(game.make_move(orig, dest))
+
+    def test_disabled_by_default(self):
+        """Tests that games are not drawn unless a rule is enabled."""
+        game = ChessVar()
+        self.shuffle_knights(game, 3)
+
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+    def test_repetition(self):
+        """Tests a draw on the third occurrence of a position."""
+        game = ChessVar(repetition_limit=3)
+        self.shuffle_knights(game, 1)
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+        self.shuffle_knights(game, 1)
+        self.assertEqual(game.get_game_state(), "DRAW")
+
+        self.assertFalse(game.make_move("e2", "e4"))
+        self.assertFalse(game.enter_fairy_piece("F", "e2"))
+
+    def test_repetition_counts_fairy_points(self):
+        """Tests that positions differing in fairy points do not repeat."""
+        game = ChessVar(repetition_limit=2)
+        self.shuffle_knights(game, 1)
+        self.assertEqual(game.get_game_state(), "DRAW")
+
+        game = ChessVar(repetition_limit=2)
+        game.make_move("g1", "f3")
+        game._black.increment_fairy_points()
+        game.make_move("g8", "f6")
+        game.make_move("f3", "g1")
+        game.make_move("f6", "g8")
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+    def test_move_limits(self):
+        """Tests the no-capture move limit and the ply limit."""
+        game = ChessVar(no_capture_limit=4)
+        for orig, dest in (("e2", "e4"), ("d7", "d5"), ("e4", "d5")):
+            self.assertTrue(game.make_move(orig, dest))
+        for orig, dest in (("g8", "f6"), ("g1", "f3"), ("f6", "g8")):
+            self.assertTrue(game.make_move(orig, dest))
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+        self.assertTrue(game.make_move("f3", "g1"))
+        self.assertEqual(game.get_game_state(), "DRAW")
+
+        game = ChessVar(ply_limit=2)
+        self.assertTrue(game.make_move("e2", "e4"))
+        self.assertTrue(game.make_move("d7", "d5"))
+        self.assertEqual(game.get_game_state(), "DRAW")
+
+    def test_king_capture_wins_at_limit(self):
+        """Tests that capturing a king on the last ply still wins."""
+        game = ChessVar(ply_limit=8)
+        for orig, dest in (("e2", "e4"), ("e7", "e5"), ("e1", "e2"), ("e8", "e7"),
+                           ("e2", "f3"), ("e7", "e8"), ("f3", "f4"), ("e5", "f4")):
+            self.assertTrue(game.make_move(orig, dest))
+
+        self.assertEqual(game.get_game_state(), "BLACK_WON")
+
+
+class TestGameHistory(unittest.TestCase):
+    """Tests move history recording and seeking."""
+    def state(self, game):
+        """Returns a game's squares, reserves, points, and turn."""
+        board = game._board
+
+        return (
+            tuple(board.get(row, col) for row in range(8) for col in range(8)),
+            {player.get_color(): tuple(player.get_reserve())
+             for player in (game._white, game._black)},
+            {player.get_color(): player.get_fairy_points()
+             for player in (game._white, game._black)},
+            game.get_current_player().get_color()
+        )
+
+    def play_random(self, game, rng, plies):
+        """Plays random moves that do not capture a king, entering fairy
+        pieces whenever possible, and returns the state after each ply
+        (starting with the initial one).
+        """
+        states = [self.state(game)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            while len(states) <= plies and game.get_game_state() == "UNFINISHED":
+                player = game.get_current_player()
+                home = (6, 7) if player.get_color() == "white" else (0, 1)
+                entered = False
+
+                for fairy in list(player.get_reserve()):
+                    token = fairy[0].upper() if player.get_color() == "white" else fairy[0]
+                    row, col = rng.choice(home), rng.randrange(8)
+
+                    if game.enter_fairy_piece(token, f"{chr(97 + col)}{8 - row}"):
+                        entered = True
+                        break
+
+                if not entered:
+                    moves = [
+                        ((row, col), dest)
+                        for row in range(8) for col in range(8)
+                        if game._board.get(row, col) is not None
+                        and game._board.get(row, col).get_color() == player.get_color()
+                        for dest in game._board.get_valid_moves(row, col)
+                        if game._board.get(*dest) is None
+                        or game._board.get(*dest).get_type() != "king"
+                    ]
+
+                    if not moves:
+                        break
+                    (row, col), (dest_row, dest_col) = rng.choice(moves)
+                    self.assertTrue(game.make_move(f"{chr(97 + col)}{8 - row}",
+                                                   f"{chr(97 + dest_col)}{8 - dest_row}"))
+
+                states.append(self.state(game))
+
+        return states
+
+    def test_moves_recorded(self):
+        """Tests that moves and fairy entries are recorded as text."""
+        game = ChessVar()
+        for orig, dest in (("e2", "e4"), ("d7", "d5"), ("d1", "g4"), ("c8", "g4")):
+            game.make_move(orig, dest)
+        game.enter_fairy_piece("F", "d1")
+        game.make_move("a3", "a4")
+
+        history = game.get_history()
+        self.assertEqual(history.get_length(), 5)
+        self.assertEqual([history.get_move(ply) for ply in range(5)],
+                         ["e2e4", "d7d5", "d1g4", "c8g4", "F@d1"])
+
+        state = history.seek(5)
+        self.assertEqual(state.get(7, 3).get_type(), "falcon")
+        self.assertEqual(state.reserves, {"white": ("hunter",), "black": ("falcon", "hunter")})
+        self.assertEqual(state.points, {"white": 1, "black": 0})
+        self.assertEqual(state.turn, "black")
+
+        state = history.seek(3)
+        self.assertEqual(state.get(4, 6).get_type(), "queen")
+        self.assertEqual(state.points, {"white": 0, "black": 0})
+
+        with self.assertRaises(IndexError):
+            history.seek(6)
+
+    def test_seek(self):
+        """Tests seeking to every ply of long games in random order."""
+        rng = random.Random(38)
+
+        for interval in (1, 5, 16):
+            game = ChessVar(snapshot_interval=interval)
+            states = self.play_random(game, rng, 300)
+            history = game.get_history()
+            self.assertEqual(history.get_length(), len(states) - 1)
+
+            plies = list(range(len(states))) * 2
+            rng.shuffle(plies)
+            plies += list(range(len(states))) + list(reversed(range(len(states))))
+
+            for ply in plies:
+                state = history.seek(ply)
+                self.assertEqual(tuple(state), states[ply], f"ply {ply}")
+
+
 class TestMoveFairyPieces(unittest.TestCase):
     """Tests fairy piece movement"""
     game = ChessVar()